@@ -0,0 +1,282 @@
+"""
+Benchmark suite for pyjmap. Synthetic tables are generated from a fixed seed, so runs are reproducible and do not
+require any game files. Every operation is timed over multiple repetitions, and its peak memory usage is measured in a
+separate traced run. Results are saved as JSON and can be compared against a previous run to detect regressions:
+
+python benchmarks/bench_jmap.py --rows 100000 --output before.json
+python benchmarks/bench_jmap.py --rows 100000 --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyjmap
+from pyjmap import JMapFieldType
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Synthetic table generator
+# ----------------------------------------------------------------------------------------------------------------------
+__TYPE_NAMES__ = {
+    "long": JMapFieldType.LONG,
+    "ulong": JMapFieldType.UNSIGNED_LONG,
+    "short": JMapFieldType.SHORT,
+    "char": JMapFieldType.CHAR,
+    "float": JMapFieldType.FLOAT,
+    "string": JMapFieldType.STRING,
+    "string_offset": JMapFieldType.STRING_OFFSET
+}
+
+__DEFAULT_MIX__ = "long=4,ulong=1,short=2,char=2,float=3,string=1,string_offset=3"
+
+
+def parse_type_mix(mix: str) -> dict:
+    """
+    Parses a type mix like "long=4,float=2" into a dictionary of field types and their weights.
+
+    :param mix: the type mix.
+    :return: the dictionary of field types and weights.
+    """
+    weights = dict()
+
+    for item in mix.split(","):
+        name, weight = item.split("=")
+        weights[__TYPE_NAMES__[name.strip()]] = float(weight)
+
+    return weights
+
+
+def _random_value_(rng: random.Random, field_type: JMapFieldType, bits: int, strings: list):
+    if field_type is JMapFieldType.FLOAT:
+        return rng.uniform(-1000.0, 1000.0)
+    elif field_type is JMapFieldType.STRING:
+        return rng.choice(strings)[:24]
+    elif field_type is JMapFieldType.STRING_OFFSET:
+        return rng.choice(strings)
+    elif field_type is JMapFieldType.UNSIGNED_LONG:
+        return rng.getrandbits(bits)
+
+    return rng.getrandbits(bits) - (1 << (bits - 1))
+
+
+def generate_table(hashtable, rows: int, fields: int, type_mix: dict, bitfields: int = 0, duplication: float = 0.5,
+                   seed: int = 0, columnar: bool = False) -> pyjmap.JMapInfo:
+    """
+    Generates a synthetic JMapInfo container with random data.
+
+    :param hashtable: the hash lookup table to be used.
+    :param rows: the number of entries.
+    :param fields: the number of fields.
+    :param type_mix: the dictionary of field types and their weights.
+    :param bitfields: the number of additional LONG fields that are bit-packed, four per word.
+    :param duplication: the ratio of duplicate strings, between 0 (all unique) and 1 (all equal).
+    :param seed: the seed for the random number generator.
+    :param columnar: whether the container stores its data column-wise.
+    :return: the generated container.
+    """
+    rng = random.Random(seed)
+    types = rng.choices(list(type_mix), weights=list(type_mix.values()), k=fields)
+    num_strings = max(1, round(rows * (1.0 - duplication)))
+    strings = [f"String{i:06d}_{rng.getrandbits(24):06X}" for i in range(num_strings)]
+
+    jmap = pyjmap.JMapInfo(hashtable, columnar)
+    layout = list()  # (name, type, mask, shift, bits)
+
+    for i, field_type in enumerate(types):
+        layout.append((f"Field{i:03d}", field_type, field_type.mask, 0, field_type.size * 8))
+    for i in range(bitfields):
+        layout.append((f"Bits{i:03d}", JMapFieldType.LONG, 0xFF << (i % 4 * 8), i % 4 * 8, 8))
+
+    # Bit-packed fields require manually specified offsets
+    if bitfields:
+        jmap.manual_offsets = True
+        offset = 0
+
+        for name, field_type, mask, shift, bits in layout:
+            if name.startswith("Bits") and shift:
+                offset -= 4
+
+            jmap.create_field(name, field_type, field_type.default, mask=mask, shift_amount=shift, offset=offset)
+            offset += field_type.size
+    else:
+        for name, field_type, mask, shift, bits in layout:
+            jmap.create_field(name, field_type, field_type.default, mask=mask, shift_amount=shift)
+
+    columns = [
+        [_random_value_(rng, field_type, bits, strings) for _ in range(rows)]
+        for name, field_type, mask, shift, bits in layout
+    ]
+    jmap.extend(zip(*columns))
+    return jmap
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------------------------------------------------------
+def measure(func, repeat: int) -> tuple:
+    """
+    Measures the best time over several runs of the function and its peak memory usage in a separate traced run.
+
+    :param func: the function to be measured.
+    :param repeat: the number of timed runs.
+    :return: the best time in seconds and the peak memory usage in bytes.
+    """
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return best, peak
+
+
+def run_benchmarks(args) -> dict:
+    hashtable = pyjmap.SuperMarioGalaxyHashTable()
+    big_endian = not args.little_endian
+    type_mix = parse_type_mix(args.mix)
+    jmap = generate_table(hashtable, args.rows, args.fields, type_mix, args.bitfields, args.duplication, args.seed)
+    buffer = pyjmap.pack_buffer(jmap, big_endian)
+    names = [field.name for field in jmap.fields] * max(1, args.rows // max(1, len(jmap.fields)))
+
+    tmp_dir = tempfile.mkdtemp(prefix="pyjmap-bench-")
+    csv_path = os.path.join(tmp_dir, "table.csv")
+    bcsv_path = os.path.join(tmp_dir, "table.bcsv")
+    jsonl_path = os.path.join(tmp_dir, "table.jsonl")
+    pyjmap.dump_csv(jmap, csv_path)
+    pyjmap.write_file(jmap, bcsv_path, big_endian)
+    csv_size = os.path.getsize(csv_path)
+
+    # Operation name -> (function, number of processed rows, number of processed bytes)
+    operations = {
+        "unpack": (lambda: pyjmap.from_buffer(hashtable, buffer, 0, big_endian), args.rows, len(buffer)),
+        "unpack_columnar": (lambda: pyjmap.from_buffer(hashtable, buffer, 0, big_endian, columnar=True),
+                            args.rows, len(buffer)),
+        "unpack_lazy_iter": (lambda: sum(1 for _ in pyjmap.from_file(hashtable, bcsv_path, big_endian, lazy=True)),
+                             args.rows, len(buffer)),
+        "makebin": (lambda: pyjmap.pack_buffer(jmap, big_endian), args.rows, len(buffer)),
+        "from_csv": (lambda: pyjmap.from_csv(hashtable, csv_path), args.rows, csv_size),
+        "dump_csv": (lambda: pyjmap.dump_csv(jmap, csv_path), args.rows, csv_size),
+        "dump_jsonl": (lambda: pyjmap.dump_jsonl(jmap, jsonl_path), args.rows, csv_size),
+        "calc_jgadget_hash": (lambda: [pyjmap.calc_jgadget_hash(name) for name in names], len(names),
+                              sum(map(len, names))),
+        "calc_old_hash": (lambda: [pyjmap.calc_old_hash(name) for name in names], len(names), sum(map(len, names)))
+    }
+
+    selected = args.ops.split(",") if args.ops else list(operations)
+    results = dict()
+
+    try:
+        for name in selected:
+            func, rows, size = operations[name]
+            seconds, peak = measure(func, args.repeat)
+            results[name] = {
+                "seconds": seconds,
+                "rows_per_s": rows / seconds if seconds else 0.0,
+                "mb_per_s": size / seconds / 1e6 if seconds else 0.0,
+                "peak_bytes": peak
+            }
+            print(f"{name:<20} {seconds * 1000:10.2f} ms {results[name]['rows_per_s']:14.0f} rows/s "
+                  f"{results[name]['mb_per_s']:9.2f} MB/s {peak / 1e6:9.2f} MB peak")
+    finally:
+        for path in (csv_path, bcsv_path, jsonl_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+        os.rmdir(tmp_dir)
+
+    return {
+        "meta": {
+            "pyjmap": pyjmap.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "parameters": {
+                "rows": args.rows, "fields": args.fields, "mix": args.mix, "bitfields": args.bitfields,
+                "duplication": args.duplication, "little_endian": args.little_endian, "seed": args.seed,
+                "repeat": args.repeat, "buffer_bytes": len(buffer)
+            }
+        },
+        "results": results
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    """
+    Prints the speed of every operation relative to a baseline run and returns the number of regressions, which are
+    operations that became slower than the given threshold.
+
+    :param results: the current results.
+    :param baseline: the baseline results.
+    :param threshold: the tolerated slowdown, for example 0.1 for 10%.
+    :return: the number of regressions.
+    """
+    regressions = 0
+
+    if results["meta"]["parameters"] != baseline["meta"]["parameters"]:
+        print("Warning: The baseline was recorded using different parameters.")
+
+    for name, result in results["results"].items():
+        previous = baseline["results"].get(name)
+
+        if previous is None:
+            continue
+
+        ratio = result["seconds"] / previous["seconds"] if previous["seconds"] else 1.0
+        memory = result["peak_bytes"] / previous["peak_bytes"] if previous["peak_bytes"] else 1.0
+        status = "REGRESSION" if ratio > 1.0 + threshold else ""
+        regressions += bool(status)
+        print(f"{name:<20} time x{ratio:6.2f}   memory x{memory:6.2f}   {status}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pyjmap using synthetic tables.")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of entries. Default is 10000.")
+    parser.add_argument("--fields", type=int, default=16, help="Number of fields. Default is 16.")
+    parser.add_argument("--mix", default=__DEFAULT_MIX__, help=f"Weights of field types. Default is {__DEFAULT_MIX__}.")
+    parser.add_argument("--bitfields", type=int, default=0, help="Number of additional bit-packed fields. Default is 0.")
+    parser.add_argument("--duplication", type=float, default=0.5, help="Ratio of duplicate strings. Default is 0.5.")
+    parser.add_argument("--little_endian", action="store_true", help="Pack data using little-endian byte order.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the table generator. Default is 0.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs per operation. Default is 5.")
+    parser.add_argument("--ops", help="Comma-separated operations to run. Default is all.")
+    parser.add_argument("--output", help="Path to save the results as JSON.")
+    parser.add_argument("--compare", help="Path to baseline results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Tolerated slowdown. Default is 0.1.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,3 +2,6 @@ __version__ = "1.0.9"
 __author__ = "Aurum"
 
 from .jmap import *
+from .recovery import *
+from .diff import *
+from .aio import *
@@ -1,4 +1,11 @@
 import argparse
+import concurrent.futures
+import contextlib
+import fnmatch
+import glob
+import os
+import sys
+import time
 from . import jmap
 
 
@@ -10,23 +17,181 @@ LOOKUP_TABLES = {
 }
 
 
+def _write_safely_(dst: str, write):
+    """
+    Calls write with a temporary file path next to the destination. The temporary file replaces the destination only if
+    writing succeeds, so that a failed conversion never leaves a partial output behind.
+    """
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+
+    try:
+        result = write(tmp_path)
+        os.replace(tmp_path, dst)
+        return result
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextlib.contextmanager
+def _profile_(enabled: bool):
+    # Profiles only if requested, so that no timings are taken otherwise
+    if not enabled:
+        yield None
+        return
+
+    with jmap.JMapProfiler() as profiler:
+        yield profiler
+
+
 def dump(args):
     jmap_enc = args.jmap_encoding if args.jmap_encoding else "shift_jisx0213"
     csv_enc = args.csv_encoding if args.csv_encoding else "utf-8"
 
-    data = jmap.from_file(LOOKUP_TABLES[args.lookup](), args.jmap, not args.little_endian, jmap_enc)
-    jmap.dump_csv(data, args.csv, csv_enc)
+    with _profile_(args.profile) as profiler:
+        data = jmap.from_file(LOOKUP_TABLES[args.lookup](), args.jmap, not args.little_endian, jmap_enc)
+        _write_safely_(args.csv, lambda path: jmap.dump_csv(data, path, csv_enc))
+
     print("Successfully dumped data to CSV file.")
 
+    if args.profile:
+        print(profiler.report())
+
 
 def pack(args):
     jmap_enc = args.jmap_encoding if args.jmap_encoding else "shift_jisx0213"
     csv_enc = args.csv_encoding if args.csv_encoding else "utf-8"
 
-    data = jmap.from_csv(LOOKUP_TABLES[args.lookup](), args.csv, csv_enc)
-    jmap.write_file(data, args.jmap, not args.little_endian, jmap_enc)
+    with _profile_(args.profile) as profiler:
+        hashtable = LOOKUP_TABLES[args.lookup]()
+        _write_safely_(args.jmap, lambda path: jmap.convert_csv(hashtable, args.csv, path, not args.little_endian,
+                                                                 jmap_enc, csv_enc))
+
     print("Successfully packed JMap data.")
 
+    if args.profile:
+        print(profiler.report())
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Batch conversion
+# ----------------------------------------------------------------------------------------------------------------------
+__WORKER_HASHTABLES__ = dict()
+
+
+def _get_worker_hashtable_(lookup: str) -> jmap.JMapHashTable:
+    # Every worker loads the hash lookup table only once, on its first task
+    hashtable = __WORKER_HASHTABLES__.get(lookup)
+
+    if hashtable is None:
+        hashtable = __WORKER_HASHTABLES__[lookup] = LOOKUP_TABLES[lookup]()
+
+    return hashtable
+
+
+def _convert_file_(command: str, lookup: str, src: str, dst: str, big_endian: bool, jmap_enc: str, csv_enc: str,
+                   profile: bool) -> tuple:
+    # Returns the number of rows and bytes read, or the error message if the file could not be converted. The recorded
+    # phases are returned as well so that they can be merged across processes.
+    with _profile_(profile) as profiler:
+        phases = profiler.phases if profile else dict()
+
+        try:
+            hashtable = _get_worker_hashtable_(lookup)
+            os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+
+            if command == "tocsv":
+                data = jmap.from_file(hashtable, src, big_endian, jmap_enc)
+                _write_safely_(dst, lambda path: jmap.dump_csv(data, path, csv_enc))
+                num_rows = len(data)
+            else:
+                num_rows = _write_safely_(dst, lambda path: jmap.convert_csv(hashtable, src, path, big_endian,
+                                                                             jmap_enc, csv_enc))
+
+            return src, num_rows, os.path.getsize(src), None, phases
+        except Exception as e:
+            return src, 0, 0, str(e), phases
+
+
+def _collect_files_(source: str, pattern: str) -> tuple:
+    """
+    Collects the files to be converted from a directory or a glob pattern. Returns the base directory that the output
+    layout is relative to and the sorted list of files.
+    """
+    if os.path.isdir(source):
+        files = list()
+
+        for root, _, names in os.walk(source):
+            files.extend(os.path.join(root, name) for name in fnmatch.filter(names, pattern))
+
+        return source, sorted(files)
+
+    files = sorted(f for f in glob.glob(source, recursive=True) if os.path.isfile(f))
+
+    if not files:
+        return os.path.dirname(source), files
+
+    return os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]), files
+
+
+def convert_batch(args):
+    jmap_enc = args.jmap_encoding if args.jmap_encoding else "shift_jisx0213"
+    csv_enc = args.csv_encoding if args.csv_encoding else "utf-8"
+
+    if args.command == "tocsv":
+        source, destination, extension = args.jmap, args.csv, ".csv"
+    else:
+        source, destination, extension = args.csv, args.jmap, args.extension
+
+    base, files = _collect_files_(source, args.pattern)
+    tasks = list()
+
+    if not files:
+        print(f"No files found matching {source}.")
+        sys.exit(1)
+
+    for src in files:
+        rel_path = os.path.relpath(os.path.abspath(src), os.path.abspath(base))
+        dst = os.path.join(destination, os.path.splitext(rel_path)[0] + extension)
+        tasks.append((args.command, args.lookup, src, dst, not args.little_endian, jmap_enc, csv_enc, args.profile))
+
+    num_files = num_rows = num_bytes = num_failed = 0
+    start_time = time.perf_counter()
+
+    if args.jobs == 1:
+        results = (_convert_file_(*task) for task in tasks)
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(args.jobs)
+        futures = [pool.submit(_convert_file_, *task) for task in tasks]
+        results = (future.result() for future in concurrent.futures.as_completed(futures))
+
+    profiler = jmap.JMapProfiler()
+
+    for src, rows, size, error, phases in results:
+        profiler.merge(phases)
+
+        if error is None:
+            num_files += 1
+            num_rows += rows
+            num_bytes += size
+        else:
+            num_failed += 1
+            print(f"Failed to convert {src}: {error}")
+
+    if args.jobs != 1:
+        pool.shutdown()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Converted {num_files} files ({num_rows} rows, {num_bytes} bytes) in {elapsed:.2f} seconds.")
+
+    if args.profile:
+        print(profiler.report())
+
+    if num_failed:
+        print(f"{num_failed} files could not be converted.")
+        sys.exit(1)
+
 
 def main():
     parser = argparse.ArgumentParser(description="")
@@ -40,18 +205,37 @@ def main():
         sub_parser.add_argument("-le", "--little_endian", action="store_true", help="Data is little-endian?")
         sub_parser.add_argument("-jmapenc", "--jmap_encoding", help="JMap file encoding. Default is shift_jisx0213."),
         sub_parser.add_argument("-csvenc", "--csv_encoding", help="CSV file encoding. Default is utf-8"),
+        sub_parser.add_argument("-profile", "--profile", action="store_true", help="Print timings of all phases.")
+        sub_parser.add_argument("-j", "--jobs", type=int, help="Number of processes for batch conversion. Default is "
+                                                                 "the number of CPUs.")
         sub_parser.add_argument("lookup", choices=["smg", "dkjb", "sms", "lm"], help="The hash lookup table to use.")
 
-    dump_parser.add_argument("jmap", help="Path to JMap data.")
-    dump_parser.add_argument("csv", help="Path to CSV file.")
+    dump_parser.add_argument("-pattern", "--pattern", default="*.bcsv", help="File name pattern when converting a "
+                                                                             "directory. Default is *.bcsv.")
+    dump_parser.add_argument("jmap", help="Path to JMap data, a directory or a glob pattern.")
+    dump_parser.add_argument("csv", help="Path to CSV file or output directory.")
     dump_parser.set_defaults(func=dump)
 
-    pack_parser.add_argument("csv", help="Path to CSV file.")
-    pack_parser.add_argument("jmap", help="Path to JMap data.")
+    pack_parser.add_argument("-pattern", "--pattern", default="*.csv", help="File name pattern when converting a "
+                                                                            "directory. Default is *.csv.")
+    pack_parser.add_argument("-ext", "--extension", default=".bcsv", help="Extension of packed files in batch mode. "
+                                                                          "Default is .bcsv.")
+    pack_parser.add_argument("csv", help="Path to CSV file, a directory or a glob pattern.")
+    pack_parser.add_argument("jmap", help="Path to JMap data or output directory.")
     pack_parser.set_defaults(func=pack)
 
     args = parser.parse_args()
-    args.func(args)
+    source = args.jmap if args.command == "tocsv" else args.csv
+
+    if os.path.isfile(source):
+        args.func(args)
+    elif not os.path.isdir(source) and not glob.has_magic(source):
+        parser.error(f"Source path {source} does not exist.")
+    else:
+        if not args.jobs:
+            args.jobs = os.cpu_count() or 1
+
+        convert_batch(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+"""
+Asynchronous loading and saving of JMap data for applications that run an asyncio event loop, such as web services.
+Reading, decoding and packing never block the event loop. All work is offloaded to an executor instead. By default,
+the event loop's default thread pool is used. As decoding is CPU-bound, threads compete with the event loop for the GIL,
+so the loop may be delayed under heavy load. If a ProcessPoolExecutor is specified, files are read and decoded in
+worker processes instead. Only the decoded columns are sent back, and the containers are built on the event loop in
+small slices that yield in between, which keeps the loop responsive even when hundreds of tables are loaded.
+
+async def handler():
+    tables = await aload_many(hash_table, ["A.bcsv", "B.bcsv"], limit=8)
+"""
+
+__all__ = ["afrom_file", "awrite_file", "aload_many"]
+
+import asyncio
+import concurrent.futures
+
+from .jmap import JMapHashTable, JMapInfo, _decode_contents_, _restore_fields_, from_file, write_file
+
+
+__RESTORE_CHUNK_SIZE__ = 2048  # Number of entries that are added to a container before yielding to the event loop
+
+
+def _load_contents_(file_path: str, big_endian: bool, encoding: str) -> tuple:
+    # Reads and decodes a file in a worker process
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    return _decode_contents_(data, big_endian, encoding)
+
+
+async def afrom_file(hashtable: JMapHashTable, file_path: str, big_endian: bool = True,
+                     encoding: str = "shift_jisx0213", columnar: bool = False, fields=None, executor=None) -> JMapInfo:
+    """
+    Asynchronously creates and returns a new JMapInfo container by unpacking the contents from the given file path.
+    The file is read and decoded using the given executor, or the event loop's default executor if None. If the
+    executor is a ProcessPoolExecutor, the container is built from the decoded columns on the event loop in slices.
+
+    :param hashtable: the hash lookup table to be used.
+    :param file_path: the file path to the JMap / BCSV file.
+    :param big_endian: the endianness of the data.
+    :param encoding: the encoding for strings.
+    :param columnar: whether the container should store its data column-wise.
+    :param fields: the keys (names or hashes) of the fields to be decoded.
+    :param executor: the thread or process pool executor to be used.
+    :return: the unpacked JMapInfo container.
+    """
+    loop = asyncio.get_event_loop()
+
+    if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+        contents = await loop.run_in_executor(executor, _load_contents_, file_path, big_endian, encoding)
+        jmap = JMapInfo(hashtable, columnar)
+        columns = _restore_fields_(jmap, contents, fields)
+        num_entries = contents[2]
+
+        for start in range(0, num_entries, __RESTORE_CHUNK_SIZE__):
+            count = min(__RESTORE_CHUNK_SIZE__, num_entries - start)
+            jmap._append_columns_([values[start:start + count] for values in columns], count)
+            await asyncio.sleep(0)
+
+        if not num_entries:
+            jmap._append_columns_(columns, 0)
+
+        return jmap
+
+    return await loop.run_in_executor(executor, lambda: from_file(hashtable, file_path, big_endian, encoding,
+                                                                  columnar, fields=fields))
+
+
+async def awrite_file(jmap: JMapInfo, file_path: str, big_endian: bool = True, encoding: str = "shift_jisx0213",
+                      executor=None):
+    """
+    Asynchronously packs the given JMapInfo's contents according to the BCSV format and writes them to the specified
+    file. Packing and writing is done using the given thread pool executor, or the event loop's default executor if
+    None. The container should not be modified until the returned coroutine has completed.
+
+    :param jmap: the JMapInfo container.
+    :param file_path: the file path to write the data to.
+    :param big_endian: the endianness of the data.
+    :param encoding: the encoding for strings.
+    :param executor: the thread pool executor to be used.
+    """
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(executor, write_file, jmap, file_path, big_endian, encoding)
+
+
+async def aload_many(hashtable: JMapHashTable, file_paths, big_endian: bool = True, encoding: str = "shift_jisx0213",
+                     columnar: bool = False, fields=None, executor=None, limit: int = 16) -> list:
+    """
+    Asynchronously loads multiple files concurrently. At most limit files are loaded at the same time, which bounds
+    the number of pending executor jobs and the memory used by files that are being decoded. See afrom_file for
+    details.
+
+    :param hashtable: the hash lookup table to be used.
+    :param file_paths: the file paths to the JMap / BCSV files.
+    :param big_endian: the endianness of the data.
+    :param encoding: the encoding for strings.
+    :param columnar: whether the containers should store their data column-wise.
+    :param fields: the keys (names or hashes) of the fields to be decoded.
+    :param executor: the thread or process pool executor to be used.
+    :param limit: the maximum number of files to be loaded at the same time.
+    :return: the list of unpacked JMapInfo containers, in the same order as the file paths.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def load(file_path):
+        async with semaphore:
+            return await afrom_file(hashtable, file_path, big_endian, encoding, columnar, fields, executor)
+
+    return list(await asyncio.gather(*[load(file_path) for file_path in file_paths]))
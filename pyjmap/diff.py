@@ -0,0 +1,544 @@
+"""
+Structural comparison of JMapInfo containers. A diff consists of schema differences, which are determined from the
+fields of both containers, and row differences. Rows are matched by the values of one or more key fields using a hash
+join. If no key is specified, rows are matched by aligning both tables as sequences instead. Matched rows are compared
+cell by cell over the fields that both containers share. Three-way merges are built on top of two diffs against a
+common base:
+
+changes = diff(vanilla, modded, key="name")
+merged, conflicts = merge(vanilla, ours, theirs, key="name")
+"""
+
+__all__ = ["JMapRowChange", "JMapConflict", "JMapDiff", "diff", "merge"]
+
+import bisect
+import collections
+import difflib
+import operator
+
+from .jmap import JMapInfo, JMapField, _JMapLazyEntries
+
+
+JMapRowChange = collections.namedtuple("JMapRowChange", ["old_index", "new_index", "cells"])
+JMapRowChange.__doc__ = """A changed row. Cells maps the hashes of changed fields to pairs of old and new values."""
+
+JMapConflict = collections.namedtuple("JMapConflict", ["row", "field", "base", "ours", "theirs"])
+JMapConflict.__doc__ = """
+A merge conflict. Row is the base index of the affected row, or None for conflicting added rows. Field is the hash of
+the affected field, or None if whole rows or field definitions conflict."""
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------------------------------------------------
+def _row_tuples_(jmap: JMapInfo, field_hashes: tuple) -> list:
+    # Collects the values of the given fields for every row as tuples
+    if not field_hashes:
+        return [()] * len(jmap)
+
+    if jmap._columns_ is not None and not isinstance(jmap._entries_, _JMapLazyEntries):
+        return list(zip(*[jmap._columns_[field_hash] for field_hash in field_hashes]))
+
+    getter = operator.itemgetter(*field_hashes)
+
+    if len(field_hashes) == 1:
+        return [(getter(entry._data_),) for entry in jmap]
+
+    return [getter(entry._data_) for entry in jmap]
+
+
+def _resolve_key_(jmap: JMapInfo, key) -> tuple:
+    # Resolves one or more field keys (names or hashes) to a tuple of field hashes
+    if isinstance(key, (str, int)):
+        key = (key,)
+
+    return tuple(jmap.get_field(field_key).hash for field_key in key)
+
+
+def _projector_(hashes: tuple, field_hashes: list):
+    # Returns a function that picks the values of the given fields from a row tuple of the given fields as a tuple, or
+    # None if a field's data is missing
+    positions = {field_hash: position for position, field_hash in enumerate(hashes)}
+
+    if any(field_hash not in positions for field_hash in field_hashes):
+        return None
+    if not field_hashes:
+        return lambda row: ()
+    if len(field_hashes) == 1:
+        position = positions[field_hashes[0]]
+        return lambda row: (row[position],)
+
+    return operator.itemgetter(*[positions[field_hash] for field_hash in field_hashes])
+
+
+def _same_definition_(field: JMapField, other: JMapField) -> bool:
+    return field.type is other.type and field.mask == other.mask and field.shift == other.shift
+
+
+def _common_prefix_(old_rows: list, old_start: int, new_rows: list, new_start: int, limit: int) -> int:
+    # Returns the number of equal rows at the given positions. Slices of growing size are compared, so that long runs
+    # of equal rows are compared in C rather than row by row.
+    size = 0
+    step = 1
+
+    while step:
+        step = min(step, limit - size)
+
+        old_offset = old_start + size
+        new_offset = new_start + size
+
+        if step and old_rows[old_offset:old_offset + step] == new_rows[new_offset:new_offset + step]:
+            size += step
+            step *= 2
+        else:
+            step //= 2
+
+    return size
+
+
+def _common_suffix_(old_rows: list, old_end: int, new_rows: list, new_end: int, limit: int) -> int:
+    # Returns the number of equal rows before the given positions, see _common_prefix_
+    size = 0
+    step = 1
+
+    while step:
+        step = min(step, limit - size)
+
+        old_offset = old_end - size
+        new_offset = new_end - size
+
+        if step and old_rows[old_offset - step:old_offset] == new_rows[new_offset - step:new_offset]:
+            size += step
+            step *= 2
+        else:
+            step //= 2
+
+    return size
+
+
+def _longest_increasing_(anchors: list) -> list:
+    # Returns the longest sequence of anchors whose new indices increase, using patience sorting. The anchors are
+    # ordered by their old indices.
+    new_indices = [new_index for _, new_index in anchors]
+
+    if all(map(operator.lt, new_indices, new_indices[1:])):
+        return anchors
+
+    tails = list()         # New indices of the last anchors of the piles
+    tail_anchors = list()  # Positions of the last anchors of the piles
+    previous = list()      # Position of the preceding anchor for each anchor
+
+    for position, new_index in enumerate(new_indices):
+        pile = bisect.bisect_left(tails, new_index)
+        previous.append(tail_anchors[pile - 1] if pile else -1)
+
+        if pile == len(tails):
+            tails.append(new_index)
+            tail_anchors.append(position)
+        else:
+            tails[pile] = new_index
+            tail_anchors[pile] = position
+
+    sequence = list()
+    position = tail_anchors[-1]
+
+    while position >= 0:
+        sequence.append(anchors[position])
+        position = previous[position]
+
+    sequence.reverse()
+    return sequence
+
+
+def _match_rows_(old_rows: list, new_rows: list) -> list:
+    # Aligns two sequences of rows using patience alignment and returns the sorted blocks of matching rows as tuples of
+    # old index, new index and size. Rows that are unique in both ranges serve as anchors, of which the longest
+    # increasing sequence is matched. The ranges between anchors are aligned the same way. Only ranges without any
+    # unique rows are aligned using difflib, which takes quadratic time, but these are small in practice.
+    blocks = list()
+    ranges = [(0, len(old_rows), 0, len(new_rows))]
+
+    # Rows are only hashed once, anchors are found using the hashes and verified afterwards
+    old_keys = list(map(hash, old_rows))
+    new_keys = list(map(hash, new_rows))
+
+    while ranges:
+        old_start, old_end, new_start, new_end = ranges.pop()
+
+        # Match common leading and trailing rows
+        size = _common_prefix_(old_rows, old_start, new_rows, new_start, min(old_end - old_start, new_end - new_start))
+
+        if size:
+            blocks.append((old_start, new_start, size))
+            old_start += size
+            new_start += size
+
+        size = _common_suffix_(old_rows, old_end, new_rows, new_end, min(old_end - old_start, new_end - new_start))
+
+        if size:
+            old_end -= size
+            new_end -= size
+            blocks.append((old_end, new_end, size))
+
+        if old_start == old_end or new_start == new_end:
+            continue
+
+        # Find anchors, ordered by their old indices
+        old_slice = old_keys[old_start:old_end]
+        new_slice = new_keys[new_start:new_end]
+        old_counts = collections.Counter(old_slice)
+        new_counts = collections.Counter(new_slice)
+        new_indices = dict(zip(new_slice, range(new_start, new_end)))
+        anchors = [
+            (old_index, new_indices[key]) for old_index, key in enumerate(old_slice, old_start)
+            if old_counts[key] == 1 and new_counts[key] == 1
+        ]
+        anchors = [(old_index, new_index) for old_index, new_index in anchors
+                   if old_rows[old_index] == new_rows[new_index]]
+
+        if not anchors:
+            matcher = difflib.SequenceMatcher(None, old_rows[old_start:old_end], new_rows[new_start:new_end],
+                                              autojunk=False)
+            blocks.extend((old_start + old_offset, new_start + new_offset, size)
+                          for old_offset, new_offset, size in matcher.get_matching_blocks() if size)
+            continue
+
+        # Match runs of consecutive anchors and align the ranges between them
+        run_start = None
+
+        for old_index, new_index in _longest_increasing_(anchors):
+            if run_start is None or old_index != old_start or new_index != new_start:
+                if run_start is not None:
+                    blocks.append((run_start[0], run_start[1], old_start - run_start[0]))
+
+                if old_index > old_start and new_index > new_start:
+                    ranges.append((old_start, old_index, new_start, new_index))
+
+                run_start = (old_index, new_index)
+
+            old_start = old_index + 1
+            new_start = new_index + 1
+
+        blocks.append((run_start[0], run_start[1], old_start - run_start[0]))
+
+        if old_start < old_end and new_start < new_end:
+            ranges.append((old_start, old_end, new_start, new_end))
+
+    blocks.sort()
+    return blocks
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Diff
+# ----------------------------------------------------------------------------------------------------------------------
+class JMapDiff:
+    """
+    The differences between an old and a new JMapInfo container. Rows are referred to by their indices in the old and
+    new container, respectively. Diffs should be created using the diff function.
+    """
+
+    def __init__(self, old: JMapInfo, new: JMapInfo, key=None):
+        """
+        Computes the differences between the given containers. If a key (one or more field names or hashes) is given,
+        rows with equal key values are matched. Otherwise, rows are matched by aligning both tables as sequences.
+
+        :param old: the old container.
+        :param new: the new container.
+        :param key: the key field(s) to match rows by, or None.
+        :raises KeyError: if a key field does not exist in both containers or its data is not stored in both.
+        """
+        self.old = old
+        self.new = new
+        self.added_fields = [field for field_hash, field in new._fields_.items() if field_hash not in old._fields_]
+        self.removed_fields = [field for field_hash, field in old._fields_.items() if field_hash not in new._fields_]
+        self.changed_fields = [
+            (field, new._fields_[field_hash]) for field_hash, field in old._fields_.items()
+            if field_hash in new._fields_ and not _same_definition_(field, new._fields_[field_hash])
+        ]
+
+        # Rows are compared over the fields whose data is stored in both containers
+        new_hashes = {field.hash for field in new._data_fields_()}
+        self.field_hashes = tuple(field.hash for field in old._data_fields_() if field.hash in new_hashes)
+        self.key = None if key is None else _resolve_key_(old, key)
+
+        if self.key is not None:
+            _resolve_key_(new, key)
+
+            for field_hash in self.key:
+                if field_hash not in self.field_hashes:
+                    raise KeyError(f"Key field [{field_hash:08X}] is not decoded in both containers")
+
+        old_rows = _row_tuples_(old, self.field_hashes)
+        new_rows = _row_tuples_(new, self.field_hashes)
+        self.pairs = list()         # Pairs of old and new indices of all matched rows
+        self.added_rows = list()    # Indices of new rows without a match
+        self.removed_rows = list()  # Indices of old rows without a match
+        self.changed_rows = list()  # Matched rows that differ, see JMapRowChange
+
+        if self.key is None:
+            candidates = self._align_(old_rows, new_rows)
+        else:
+            candidates = self._join_(old_rows, new_rows)
+
+        # Compare matched rows that may differ cell by cell
+        for old_index, new_index in candidates:
+            old_row = old_rows[old_index]
+            new_row = new_rows[new_index]
+
+            if old_row != new_row:
+                cells = {
+                    field_hash: (old_val, new_val)
+                    for field_hash, old_val, new_val in zip(self.field_hashes, old_row, new_row) if old_val != new_val
+                }
+                self.changed_rows.append(JMapRowChange(old_index, new_index, cells))
+
+    def _join_(self, old_rows: list, new_rows: list) -> list:
+        # Matches rows with equal key values. Duplicate keys are matched in order of their occurrence. Returns the pairs
+        # of rows that may differ, which are all pairs.
+        positions = [self.field_hashes.index(field_hash) for field_hash in self.key]
+        get_key = operator.itemgetter(*positions)
+        new_indices = dict()
+
+        for i, row in enumerate(new_rows):
+            new_indices.setdefault(get_key(row), collections.deque()).append(i)
+
+        for i, row in enumerate(old_rows):
+            indices = new_indices.get(get_key(row))
+
+            if indices:
+                self.pairs.append((i, indices.popleft()))
+            else:
+                self.removed_rows.append(i)
+
+        matched = {new_index for _, new_index in self.pairs}
+        self.added_rows = [i for i in range(len(new_rows)) if i not in matched]
+        return self.pairs
+
+    def _align_(self, old_rows: list, new_rows: list) -> list:
+        # Matches rows by sequence alignment. Rows between matching rows are paired up in order if at least half of
+        # their cells are equal, otherwise they are considered removed and added. Returns the pairs of rows that may
+        # differ, which are only those paired up between matching rows.
+        candidates = list()
+        old_start = new_start = 0
+
+        for old_index, new_index, size in _match_rows_(old_rows, new_rows) + [(len(old_rows), len(new_rows), 0)]:
+            old_end = old_index
+            new_end = new_index
+
+            if old_start < old_end and new_start < new_end:
+                count = min(old_end - old_start, new_end - new_start)
+
+                for old_row, new_row in zip(range(old_start, old_start + count), range(new_start, new_start + count)):
+                    same = sum(map(operator.eq, old_rows[old_row], new_rows[new_row]))
+
+                    if same * 2 >= len(self.field_hashes):
+                        self.pairs.append((old_row, new_row))
+                        candidates.append((old_row, new_row))
+                    else:
+                        self.removed_rows.append(old_row)
+                        self.added_rows.append(new_row)
+
+                old_start += count
+                new_start += count
+
+            self.removed_rows.extend(range(old_start, old_end))
+            self.added_rows.extend(range(new_start, new_end))
+
+            self.pairs.extend(zip(range(old_index, old_index + size), range(new_index, new_index + size)))
+            old_start = old_index + size
+            new_start = new_index + size
+
+        return candidates
+
+    @property
+    def schema_changed(self) -> bool:
+        """Whether fields were added, removed or redefined."""
+        return bool(self.added_fields or self.removed_fields or self.changed_fields)
+
+    def __bool__(self):
+        return self.schema_changed or bool(self.added_rows or self.removed_rows or self.changed_rows)
+
+    def __repr__(self):
+        return (f"JMapDiff(fields: +{len(self.added_fields)} -{len(self.removed_fields)} ~{len(self.changed_fields)}, "
+                f"rows: +{len(self.added_rows)} -{len(self.removed_rows)} ~{len(self.changed_rows)})")
+
+
+def diff(old: JMapInfo, new: JMapInfo, key=None) -> JMapDiff:
+    """
+    Computes the differences between two JMapInfo containers. If a key (one or more field names or hashes) is given,
+    rows with equal key values are matched using a hash join. Otherwise, rows are matched by sequence alignment. Both
+    take linear time in practice, about 0.3 seconds for 100k rows with 1k changes. Only alignment can degrade: ranges
+    of changed rows that contain no row that is unique in both containers are aligned in quadratic time.
+
+    :param old: the old container.
+    :param new: the new container.
+    :param key: the key field(s) to match rows by, or None.
+    :return: the differences between both containers.
+    """
+    return JMapDiff(old, new, key)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Three-way merge
+# ----------------------------------------------------------------------------------------------------------------------
+def merge(base: JMapInfo, ours: JMapInfo, theirs: JMapInfo, key=None) -> tuple:
+    """
+    Merges the changes that two containers made to a common base container. Changes to different fields or rows are
+    combined, and identical changes are applied once. If both sides make different changes to the same cell, if one
+    side changes a row that the other side removed, or if both sides add rows with the same key but different values,
+    a conflict is reported and our side is preferred. Added rows are appended after the base rows, ours first. Merging
+    tables of 100k rows takes about one second. Most of that time is spent on the two diffs against the base and on
+    creating the merged container's entries, while rows that neither side changed are copied without per-cell work.
+
+    :param base: the common base container.
+    :param ours: our modified container.
+    :param theirs: their modified container.
+    :param key: the key field(s) to match rows by, or None.
+    :return: a tuple of the merged container and the list of conflicts.
+    """
+    ours_diff = JMapDiff(base, ours, key)
+    theirs_diff = JMapDiff(base, theirs, key)
+    conflicts = list()
+
+    # Merge fields: base fields without removed ones, then fields added by either side
+    removed = {field.hash for field in ours_diff.removed_fields + theirs_diff.removed_fields}
+    redefined = dict((old.hash, new) for old, new in theirs_diff.changed_fields)
+    redefined.update((old.hash, new) for old, new in ours_diff.changed_fields)
+    fields = [redefined.get(field.hash, field) for field in base._data_fields_() if field.hash not in removed]
+    field_hashes = {field.hash for field in fields}
+    num_base = len(fields)
+
+    for field in ours_diff.added_fields + theirs_diff.added_fields:
+        if field.hash not in field_hashes:
+            fields.append(field)
+            field_hashes.add(field.hash)
+        elif field.jmap is theirs and not _same_definition_(field, ours.get_field(field.hash)):
+            conflicts.append(JMapConflict(None, field.hash, None, ours.get_field(field.hash), field))
+
+    # Collect row values as dictionaries on demand
+    tables = dict()
+
+    for jmap in (base, ours, theirs):
+        hashes = tuple(field.hash for field in jmap._data_fields_())
+        tables[id(jmap)] = (hashes, _row_tuples_(jmap, hashes))
+
+    def row_values(jmap: JMapInfo, index: int) -> dict:
+        hashes, rows = tables[id(jmap)]
+        return dict(zip(hashes, rows[index]))
+
+    defaults = {field.hash: field.default for field in fields}
+    merged_hashes = [field.hash for field in fields]
+    side_maps = list()
+
+    for side_diff in (ours_diff, theirs_diff):
+        side_maps.append((dict(side_diff.pairs), {change.old_index: change.cells for change in side_diff.changed_rows}))
+
+    (ours_map, ours_changes), (theirs_map, theirs_changes) = side_maps
+
+    def merge_row(i: int):
+        # Merges the changes to a single base row, returns None if the row was removed
+        ours_index = ours_map.get(i)
+        theirs_index = theirs_map.get(i)
+
+        if ours_index is None and theirs_index is None:
+            return None
+
+        values = dict(defaults)
+        values.update(row_values(base, i))
+
+        # Removed on one side, keep the row only if the other side changed it
+        if ours_index is None or theirs_index is None:
+            side, index, changes = (ours, ours_index, ours_changes) if theirs_index is None else \
+                (theirs, theirs_index, theirs_changes)
+
+            if i not in changes:
+                return None
+
+            values.update(row_values(side, index))
+            conflicts.append(JMapConflict(i, None, row_values(base, i),
+                                          values if side is ours else None, values if side is theirs else None))
+        else:
+            # Fields that only exist on one side take that side's value
+            values.update(row_values(theirs, theirs_index))
+            values.update(row_values(ours, ours_index))
+            values.update(row_values(base, i))
+            ours_cells = ours_changes.get(i, {})
+            theirs_cells = theirs_changes.get(i, {})
+
+            for field_hash, (old_val, new_val) in theirs_cells.items():
+                values[field_hash] = new_val
+
+            for field_hash, (old_val, new_val) in ours_cells.items():
+                if field_hash in theirs_cells and theirs_cells[field_hash][1] != new_val:
+                    conflicts.append(JMapConflict(i, field_hash, old_val, new_val, theirs_cells[field_hash][1]))
+
+                values[field_hash] = new_val
+
+        return tuple(values[field_hash] for field_hash in merged_hashes)
+
+    # Rows that both sides kept unchanged are assembled from row tuples without building dictionaries. Base fields
+    # come first, followed by the fields that were added by ours and then those that were only added by theirs.
+    base_hashes, base_rows = tables[id(base)]
+    ours_added = [field_hash for field_hash in merged_hashes[num_base:] if field_hash in ours._fields_]
+    theirs_added = [field_hash for field_hash in merged_hashes[num_base:] if field_hash not in ours._fields_]
+    projectors = (
+        _projector_(base_hashes, merged_hashes[:num_base]),
+        _projector_(tables[id(ours)][0], ours_added),
+        _projector_(tables[id(theirs)][0], theirs_added)
+    )
+    num_rows = len(base_rows)
+
+    if None in projectors:
+        rows = [merge_row(i) for i in range(num_rows)]
+    else:
+        # Indices of rows that were removed or changed by either side
+        special = set(range(num_rows)).difference(set(ours_map).intersection(theirs_map))
+        special.update(ours_changes, theirs_changes)
+
+        if merged_hashes == list(base_hashes):
+            rows = [base_rows[i] if i not in special else merge_row(i) for i in range(num_rows)]
+        else:
+            base_proj, ours_proj, theirs_proj = projectors
+            ours_rows = tables[id(ours)][1]
+            theirs_rows = tables[id(theirs)][1]
+            rows = [
+                base_proj(base_rows[i]) + ours_proj(ours_rows[ours_map[i]]) + theirs_proj(theirs_rows[theirs_map[i]])
+                if i not in special else merge_row(i) for i in range(num_rows)
+            ]
+
+    rows = [row for row in rows if row is not None]
+
+    # Append added rows, ours first
+    added_keys = dict()
+
+    for side, side_diff in ((ours, ours_diff), (theirs, theirs_diff)):
+        for index in side_diff.added_rows:
+            values = dict(defaults)
+            values.update(row_values(side, index))
+
+            if side_diff.key is not None:
+                row_key = tuple(values[field_hash] for field_hash in side_diff.key)
+                other = added_keys.get(row_key)
+
+                if other is not None and other[0] is not side:
+                    if any(other[1][field.hash] != values[field.hash] for field in fields):
+                        conflicts.append(JMapConflict(None, None, None, other[1], values))
+                    continue
+
+                added_keys[row_key] = (side, values)
+
+            rows.append(tuple(values[field_hash] for field_hash in merged_hashes))
+
+    # Build the merged container
+    merged = JMapInfo(base.hash_table, base.columnar)
+    merged.manual_offsets = base.manual_offsets
+    merged._entry_size_ = base._entry_size_
+
+    for field in fields:
+        merged._fields_[field.hash] = JMapField(merged, field.hash, field.type, field.mask, field.shift, field._offset_,
+                                                field.default)
+
+    columns = list(zip(*rows)) if rows else [[] for _ in fields]
+    merged._append_columns_(columns, len(rows))
+
+    return merged, conflicts
@@ -21,17 +21,38 @@ Super Mario Galaxy 2            New (JGadget)   big         shift_jisx0213
 """
 
 __all__ = [
-    "JMapException", "calc_old_hash", "calc_jgadget_hash", "JMapHashTable", "SuperMarioGalaxyHashTable",
+    "JMapException", "JMapProfiler", "calc_old_hash", "calc_jgadget_hash", "JMapHashTable", "SuperMarioGalaxyHashTable",
     "JungleBeatHashTable", "SuperMarioSunshineHashTable", "LuigisMansionHashTable", "JMapFieldType", "JMapField",
-    "JMapEntry", "JMapInfo", "from_buffer", "pack_buffer", "from_file", "write_file", "from_csv", "dump_csv"
+    "JMapEntry", "JMapAccessor", "JMapIndex", "JMapInfo", "JMapWriter", "JMapPatcher", "JMapParseCache", "from_buffer",
+    "from_buffers", "pack_buffer", "from_file", "iter_entries", "write_file", "from_csv", "convert_csv", "dump_csv",
+    "dump_jsonl", "to_numpy", "dump_npz"
 ]
 
+import array
+import bisect
+import collections
 import csv
 import enum
+import functools
+import hashlib
+import itertools
+import json
+import marshal
+import mmap
 import os
 import struct
+import sys
+import threading
+import time
 import warnings
 
+from . import yaz0
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Exception for JMap-related actions
@@ -43,6 +64,97 @@ class JMapException(Exception):
     pass
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+# Instrumentation
+# ----------------------------------------------------------------------------------------------------------------------
+class JMapProfiler:
+    """
+    Collects the wall time and counters of every phase of loading and saving JMap data, such as reading files, parsing
+    fields, decoding entries and strings, encoding entries and reading or writing CSV files. Phases are recorded for the
+    current thread while the profiler is used as a context manager. Decoding strings is part of decoding entries, so its
+    time is included in both phases. When no profiler is active, every operation performs a single thread-local lookup.
+
+    with JMapProfiler() as profiler:
+        info = from_file(hashtable, "Table.bcsv")
+    print(profiler.report())
+    """
+
+    def __init__(self, callback=None):
+        """
+        Constructs a new profiler. The optional callback is called with the phase name, its duration in seconds and the
+        dictionary of counters whenever a phase is recorded.
+
+        :param callback: the function to call for every recorded phase.
+        """
+        self.phases = dict()  # Maps phase names to dictionaries of calls, seconds and counters
+        self._callback_ = callback
+        self._previous_ = None
+
+    def __enter__(self):
+        self._previous_ = __PROFILER_STATE__.profiler
+        __PROFILER_STATE__.profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        __PROFILER_STATE__.profiler = self._previous_
+        self._previous_ = None
+
+    def record(self, phase: str, seconds: float, **counters):
+        """
+        Records a single run of the given phase.
+
+        :param phase: the phase name.
+        :param seconds: the duration in seconds.
+        :param counters: the counters to be added, for example rows or bytes.
+        """
+        stats = self.phases.get(phase)
+
+        if stats is None:
+            stats = self.phases[phase] = {"calls": 0, "seconds": 0.0}
+
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+
+        for name, value in counters.items():
+            stats[name] = stats.get(name, 0) + value
+
+        if self._callback_ is not None:
+            self._callback_(phase, seconds, counters)
+
+    def merge(self, phases: dict):
+        """
+        Adds the phases recorded by another profiler, for example one that ran in a different process.
+
+        :param phases: the other profiler's phases.
+        """
+        for phase, other in phases.items():
+            stats = self.phases.setdefault(phase, {"calls": 0, "seconds": 0.0})
+
+            for name, value in other.items():
+                stats[name] = stats.get(name, 0) + value
+
+    def report(self) -> str:
+        """
+        Returns a table of all recorded phases, their number of calls, total time and counters.
+
+        :return: the formatted report.
+        """
+        lines = [f"{'Phase':<16} {'Calls':>7} {'Time (ms)':>12}  Counters"]
+
+        for phase, stats in self.phases.items():
+            counters = ", ".join(f"{name}={value}" for name, value in stats.items() if name not in ("calls", "seconds"))
+            lines.append(f"{phase:<16} {stats['calls']:>7} {stats['seconds'] * 1000:>12.3f}  {counters}")
+
+        return "\n".join(lines)
+
+
+class _JMapProfilerState(threading.local):
+    profiler = None  # The active profiler of the current thread
+
+
+__PROFILER_STATE__ = _JMapProfilerState()
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Hash lookup table implementations
 # ----------------------------------------------------------------------------------------------------------------------
@@ -80,13 +192,187 @@ def calc_jgadget_hash(field_name: str) -> int:
     return field_hash & 0xFFFFFFFF
 
 
+def _get_cache_dir_() -> str:
+    # The cache directory can be overridden using the PYJMAP_CACHE_DIR environment variable
+    cache_dir = os.environ.get("PYJMAP_CACHE_DIR")
+
+    if not cache_dir:
+        if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+            cache_dir = os.environ["LOCALAPPDATA"]
+        else:
+            cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+        cache_dir = os.path.join(cache_dir, "pyjmap")
+
+    return cache_dir
+
+
+class _JMapLookupNames:
+    """
+    The known field names from a lookup file, stored as a sorted array of hashes and a blob of UTF-8 encoded names.
+    Names are decoded on demand. The data is loaded from a precompiled binary cache that gets rebuilt whenever the
+    lookup file changes. Instances are shared between all hash tables using the same lookup file and hash function.
+    """
+
+    # Cache file header: magic, version, probe hash, number of names, size and modification time of the lookup file,
+    # blob size. The probe hash tells apart hash functions that share the same name, such as lambdas.
+    __HEADER__ = struct.Struct("<4s3IQqI")
+    __MAGIC__ = b"PJLC"
+    __VERSION__ = 2
+    __PROBE__ = "pyjmap-lookup-probe"
+
+    def __init__(self, hashes: array.array, offsets: array.array, blob: bytes):
+        self._hashes_ = hashes    # Sorted hashes
+        self._offsets_ = offsets  # Offsets of the names into the blob, contains one more element than hashes
+        self._blob_ = blob        # Blob of UTF-8 encoded names
+        self._names_ = dict()     # Names that have been decoded already
+
+    def __len__(self):
+        return len(self._hashes_)
+
+    def __contains__(self, field_hash: int):
+        i = bisect.bisect_left(self._hashes_, field_hash)
+        return i < len(self._hashes_) and self._hashes_[i] == field_hash
+
+    def find(self, field_hash: int):
+        name = self._names_.get(field_hash)
+
+        if name is None:
+            i = bisect.bisect_left(self._hashes_, field_hash)
+
+            if i == len(self._hashes_) or self._hashes_[i] != field_hash:
+                return None
+
+            name = self._blob_[self._offsets_[i]:self._offsets_[i + 1]].decode("utf-8")
+            self._names_[field_hash] = name
+
+        return name
+
+    @classmethod
+    def load(cls, hash_func, lookup_file_path: str):
+        stat = os.stat(lookup_file_path)
+        probe = hash_func(cls.__PROBE__) & 0xFFFFFFFF
+        # Callables like functools.partial objects have no name, their type's name is used instead
+        qualname = getattr(hash_func, "__qualname__", type(hash_func).__qualname__)
+        func_name = f"{getattr(hash_func, '__module__', None)}.{qualname}"
+        short_name = "".join(c for c in qualname.rsplit(".", 1)[-1] if c.isalnum() or c == "_")
+        path_digest = hashlib.sha1(f"{lookup_file_path}|{func_name}".encode("utf-8")).hexdigest()[:8]
+        cache_name = f"{os.path.splitext(os.path.basename(lookup_file_path))[0]}-{short_name}-{path_digest}.bin"
+        cache_path = os.path.join(_get_cache_dir_(), cache_name)
+
+        # Try to load the precompiled cache first
+        try:
+            with open(cache_path, "rb") as f:
+                names = cls._unpack_(f.read(), stat, probe)
+
+            if names is not None:
+                return names
+        except (OSError, ValueError, struct.error):
+            pass
+
+        # Parse the lookup file and try to store the cache
+        lookup = dict()
+
+        with open(lookup_file_path, "r", encoding="utf-8") as f:
+            for field in f.readlines():
+                # Comment line?
+                if field.startswith("#"):
+                    continue
+
+                field = field.strip("\r\n")
+                lookup[hash_func(field)] = field
+
+        names = cls._from_lookup_(lookup)
+
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+
+            with open(tmp_path, "wb") as f:
+                f.write(names._pack_(stat, probe))
+
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+        return names
+
+    @classmethod
+    def _from_lookup_(cls, lookup: dict):
+        hashes = array.array("I", sorted(lookup))
+        offsets = array.array("I", [0])
+        chunks = list()
+
+        for field_hash in hashes:
+            chunks.append(lookup[field_hash].encode("utf-8"))
+            offsets.append(offsets[-1] + len(chunks[-1]))
+
+        return cls(hashes, offsets, b"".join(chunks))
+
+    @classmethod
+    def _unpack_(cls, data: bytes, stat, probe: int):
+        magic, version, src_probe, num_names, src_size, src_mtime, len_blob = cls.__HEADER__.unpack_from(data, 0)
+
+        if magic != cls.__MAGIC__ or version != cls.__VERSION__ or src_probe != probe:
+            return None
+        if src_size != stat.st_size or src_mtime != stat.st_mtime_ns:
+            return None
+
+        off_hashes = cls.__HEADER__.size
+        off_offsets = off_hashes + num_names * 4
+        off_blob = off_offsets + (num_names + 1) * 4
+
+        if len(data) != off_blob + len_blob:
+            return None
+
+        hashes = array.array("I", data[off_hashes:off_offsets])
+        offsets = array.array("I", data[off_offsets:off_blob])
+
+        if sys.byteorder == "big":
+            hashes.byteswap()
+            offsets.byteswap()
+
+        return cls(hashes, offsets, data[off_blob:])
+
+    def _pack_(self, stat, probe: int) -> bytes:
+        hashes = array.array("I", self._hashes_)
+        offsets = array.array("I", self._offsets_)
+
+        if sys.byteorder == "big":
+            hashes.byteswap()
+            offsets.byteswap()
+
+        header = self.__HEADER__.pack(self.__MAGIC__, self.__VERSION__, probe, len(hashes), stat.st_size,
+                                      stat.st_mtime_ns, len(self._blob_))
+        return header + hashes.tobytes() + offsets.tobytes() + self._blob_
+
+
+__LOOKUP_NAMES__ = dict()  # Shared lookup names for every combination of hash function and lookup file
+
+
+def _get_lookup_names_(hash_func, lookup_file_path: str) -> _JMapLookupNames:
+    key = (hash_func, os.path.abspath(lookup_file_path))
+    names = __LOOKUP_NAMES__.get(key)
+
+    if names is None:
+        names = _JMapLookupNames.load(hash_func, key[1])
+        __LOOKUP_NAMES__[key] = names
+
+    return names
+
+
 class JMapHashTable:
     """
     A hash lookup table implementation for known field names. This stores a string for a given hash. The actual hashing
     algorithm differs between the games and needs to be specified first. A file that lists known field names can be used
-    to initialize the hash table.
+    to initialize the hash table. The known field names are loaded lazily from a precompiled binary cache and are shared
+    by all hash tables using the same lookup file, whereas names that are added later belong to the hash table itself.
+    Calculated hashes are memoized, so looking up the same field names repeatedly is cheap.
     """
 
+    # Maximum number of memoized field name hashes
+    __CALC_CACHE_SIZE__ = 4096
+
     def __init__(self, hash_func, lookup_file_path):
         """
         Constructs a new hash table using the specified hash function and list file of known field names. Each line
@@ -98,19 +384,26 @@ class JMapHashTable:
         :raises FileNotFoundError: when the lookup file cannot be found.
         """
         self._hash_func_ = hash_func
-        self._lookup_ = dict()
-
-        if os.path.exists(lookup_file_path):
-            for field in open(lookup_file_path, "r", encoding="utf-8").readlines():
-                # Comment line?
-                if field.startswith("#"):
-                    continue
+        self._lookup_ = dict()  # Names that have been added in addition to the known field names
+        self._lookup_file_path_ = lookup_file_path
+        self._known_names_ = None
+        self._calc_cache_ = dict()
 
-                field = field.strip("\r\n")
-                self._lookup_[self.calc(field)] = field
-        else:
+        if not os.path.exists(lookup_file_path):
             raise FileNotFoundError(f"Lookup names file \"{lookup_file_path}\" cannot be found!")
 
+    def __getstate__(self):
+        # The shared known field names are loaded again after unpickling
+        state = self.__dict__.copy()
+        state["_known_names_"] = None
+        return state
+
+    def _get_known_names_(self) -> _JMapLookupNames:
+        if self._known_names_ is None:
+            self._known_names_ = _get_lookup_names_(self._hash_func_, self._lookup_file_path_)
+
+        return self._known_names_
+
     def calc(self, field_name: str) -> int:
         """
         Calculates the hash value over a given field name. The resulting hash is a 32-bit value.
@@ -118,7 +411,16 @@ class JMapHashTable:
         :param field_name: the field name to be hashed.
         :returns: the 32-bit hash value.
         """
-        return self._hash_func_(field_name)
+        field_hash = self._calc_cache_.get(field_name)
+
+        if field_hash is None:
+            if len(self._calc_cache_) >= self.__CALC_CACHE_SIZE__:
+                self._calc_cache_.clear()
+
+            field_hash = self._hash_func_(field_name)
+            self._calc_cache_[field_name] = field_hash
+
+        return field_hash
 
     def find(self, field_hash: int) -> str:
         """
@@ -131,8 +433,9 @@ class JMapHashTable:
         """
         if field_hash in self._lookup_:
             return self._lookup_[field_hash]
-        else:
-            return f"[{field_hash:08X}]"
+
+        name = self._get_known_names_().find(field_hash)
+        return f"[{field_hash:08X}]" if name is None else name
 
     def add(self, field_name: str) -> int:
         """
@@ -144,7 +447,7 @@ class JMapHashTable:
         """
         field_hash = self.calc(field_name)
 
-        if field_hash not in self._lookup_:
+        if field_hash not in self._lookup_ and field_hash not in self._get_known_names_():
             self._lookup_[field_hash] = field_name
 
         return field_hash
@@ -247,6 +550,7 @@ class JMapField:
     mask, shift amount and offset for an individual field. Actual fields should be created by the JMapInfo instance
     itself. All entries in a JMapInfo should contain data for every field in the container.
     """
+    __slots__ = ("_jmap_", "_hash_", "_type_", "mask", "shift", "_default_", "_offset_")
 
     # Structures for parsing and packing
     __STRUCT_BE__ = struct.Struct(">2IH2b")  # Big-endian
@@ -332,6 +636,7 @@ class JMapEntry:
     An entry (or row) of a JMapInfo container that holds the actual data. Every entry should contain data for all fields
     in a JMap container. The data is stored as hash-value pairs. Data can be accessed using the field hash or name.
     """
+    __slots__ = ("_jmap_", "_data_")
 
     def __init__(self, jmap):
         """
@@ -385,6 +690,9 @@ class JMapEntry:
             raise TypeError("Key must be a str or int!")
 
     def __setitem__(self, field_key, value):
+        if self._jmap_ is not None and self._jmap_._share_ is not None:
+            self._jmap_._unshare_()
+
         if isinstance(field_key, str):
             field_hash = self._jmap_.hash_table.calc(field_key)
 
@@ -401,9 +709,13 @@ class JMapEntry:
                 raise TypeError(f"Wrong data type for field [{field_key:08X}]: Expected {str(type(self._data_[field_key]))}, found {type(value)} instead.")
             else:
                 self._data_[field_key] = value
+                field_hash = field_key
         else:
             raise TypeError("Key must be a str or int!")
 
+        if self._jmap_ is not None and self._jmap_._indexes_:
+            self._jmap_._invalidate_indexes_(field_hash)
+
     def __contains__(self, field_key):
         if isinstance(field_key, str):
             return self._jmap_.hash_table.calc(field_key) in self._data_
@@ -413,430 +725,2120 @@ class JMapEntry:
             raise TypeError("Key must be a str or int!")
 
 
-# ----------------------------------------------------------------------------------------------------------------------
-# JMapInfo implementation according to the BCSV / JMap format
-# ----------------------------------------------------------------------------------------------------------------------
-class JMapInfo:
-    """
-    The table-like JMap container that consists of individual fields and entries. Provides high-level access to entries.
-    A hash lookup table is used to retrieve proper names for fields.
-    """
+# Typed arrays are just large enough to hold all values that can be unpacked
+__COLUMN_TYPECODES__ = {
+    JMapFieldType.LONG: "i",
+    JMapFieldType.FLOAT: "d",
+    JMapFieldType.UNSIGNED_LONG: "i",
+    JMapFieldType.SHORT: "h",
+    JMapFieldType.CHAR: "b"
+}
 
-    # Structures for parsing and packing
-    __STRUCT_BE__ = struct.Struct(">4I")  # Big-endian
-    __STRUCT_LE__ = struct.Struct("<4I")  # Little-endian
-    __U16_BE__ = struct.Struct(">H")
-    __U16_LE__ = struct.Struct("<H")
-    __U32_BE__ = struct.Struct(">I")
-    __U32_LE__ = struct.Struct("<I")
-    __F32_BE__ = struct.Struct(">f")
-    __F32_LE__ = struct.Struct("<f")
 
-    def __init__(self, hash_table: JMapHashTable):
-        """
-        Constructs a new JMapInfo container with no fields or entries. The specified lookup hash table will be used to
-        retrieve proper names for hashes.
+def _make_column_(field_type: JMapFieldType, values):
+    # Numeric data is stored in typed arrays, strings are stored in lists. Integers are not range-checked when they are
+    # set, they are masked when packing instead. Columns that contain values which do not fit into a typed array are
+    # therefore stored in lists, like in entries that store their data in dictionaries.
+    typecode = __COLUMN_TYPECODES__.get(field_type)
 
-        :param hash_table: the hash lookup table to be used.
-        """
-        self._fields_ = dict()          # Maps fields to hashes for quick access.
-        self._entries_ = list()         # List of actual entries.
-        self._hash_table_ = hash_table  # The lookup hash table that is used to retrieve proper field names.
-        self._entry_size_ = -1          # Size of a single entry.
-        self.manual_offsets = False     # Requires manually-specified field offsets. Necessary for PA collision data.
+    if typecode is None:
+        return list(values)
 
-    @property
-    def hash_table(self):
-        """
-        Returns the hash lookup table used by this container.
+    values = values if isinstance(values, (list, tuple, array.array)) else list(values)
 
-        :return: the hash lookup table.
-        """
-        return self._hash_table_
+    try:
+        return array.array(typecode, values)
+    except OverflowError:
+        return list(values)
 
-    @property
-    def fields(self) -> tuple:
-        """
-        Returns a tuple of all fields in this container.
 
-        :return: the tuple of all fields.
-        """
-        return tuple(self._fields_.values())
+def _widen_column_(columns: dict, field_hash: int) -> list:
+    # Replaces a typed array column with a list that can hold any value
+    column = columns[field_hash]
 
-    def __iter__(self):
-        return iter(self._entries_)
+    if isinstance(column, array.array):
+        column = columns[field_hash] = column.tolist()
 
-    def __reversed__(self):
-        return reversed(self._entries_)
+    return column
+
+
+def _check_column_(field: JMapField, values):
+    # Validates the data types of all values at once instead of checking every value individually
+    data_type = field.type.data_type
+
+    for value_type in set(map(type, values)):
+        if value_type is not data_type:
+            raise TypeError(f"Wrong data type for field [{field.hash:08X}]: Expected {data_type}, found {value_type} instead.")
 
-    def __repr__(self):
-        return repr(self._entries_)
+
+class _JMapColumnRow:
+    """
+    A lightweight view onto a single row of a column-wise JMapInfo container. It mimics the hash-value dictionary that
+    JMapEntry uses to store its data, so that entries behave the same regardless of the container's storage mode.
+    """
+    __slots__ = ("_columns_", "_index_")
+
+    def __init__(self, columns: dict, index: int):
+        self._columns_ = columns
+        self._index_ = index
 
     def __len__(self):
-        return len(self._entries_)
+        return len(self._columns_)
 
-    def __getitem__(self, key):
-        return self._entries_[key]
+    def __iter__(self):
+        return iter(self._columns_)
 
-    def __delitem__(self, key):
-        if isinstance(key, slice):
-            for i in reversed(range(*key.indices(len(self._entries_)))):
-                self._entries_[i]._jmap_ = None
-                del self._entries_[i]
-        else:
-            self._entries_[key]._jmap_ = None
-            del self._entries_[key]
+    def __contains__(self, field_hash):
+        return field_hash in self._columns_
 
-    def __contains__(self, field_key):
-        if isinstance(field_key, str):
-            return self._hash_table_.calc(field_key) in self._fields_
-        elif isinstance(field_key, int):
-            return field_key in self._fields_
-        else:
-            raise TypeError("Key must be a str or int!")
+    def __getitem__(self, field_hash):
+        return self._columns_[field_hash][self._index_]
 
-    def get_field(self, field_key) -> JMapField:
-        """
-        Retrieves the field using the specified key (hash or name) and remove's the field's data from all entries.
+    def __setitem__(self, field_hash, value):
+        try:
+            self._columns_[field_hash][self._index_] = value
+        except OverflowError:
+            _widen_column_(self._columns_, field_hash)[self._index_] = value
 
-        :param field_key: the field's key (hash or name).
-        :return: the field that corresponds to the key.
-        """
-        if isinstance(field_key, str):
-            field_hash = self._hash_table_.calc(field_key)
+    def items(self):
+        return [(field_hash, column[self._index_]) for field_hash, column in self._columns_.items()]
 
-            if field_hash not in self._fields_:
-                raise KeyError(f"Entry does not contain the field \"{field_key}\"")
-            else:
-                return self._fields_[field_hash]
-        elif isinstance(field_key, int):
-            if field_key not in self._fields_:
-                raise KeyError(f"Entry does not contain the field [{field_key}]")
-            else:
-                return self._fields_[field_key]
-        else:
-            raise TypeError("Key must be a str or int!")
+    def copy(self) -> dict:
+        return dict(self.items())
 
-    def create_field(self, field_name, field_type: JMapFieldType, defval, mask: int = -1, shift_amount: int = 0, offset: int = 0):
+
+class JMapAccessor:
+    """
+    Provides fast access to a single field's data. The field's hash and data type are resolved only once, so repeated
+    access costs a single dictionary or array lookup. Accessors should be created using JMapInfo's accessor method.
+    Values can be accessed by entry or by the entry's index:
+
+    name = info.accessor("name")
+    for entry in info:
+        print(name(entry))
+    name[0] = "AstroGalaxy"
+    """
+    __slots__ = ("_jmap_", "_field_", "_hash_", "_data_type_")
+
+    def __init__(self, jmap, field: JMapField):
         """
-        Creates a new field with the given name, type, mask and shift amount. This also sets the field's data to the
-        default value for every entry. If a field with the same hash already exists, a JMapException will be raised. The
-        field's offset should only be provided when the JMapInfo container uses manually-specified field offsets.
+        Constructs a new accessor for the given field of the specified JMapInfo container. This should not be called
+        directly. Instead, use JMapInfo's accessor method.
 
-        :param field_name: the new field's name.
-        :param field_type: the new field's data type.
-        :param defval: the new field's default value.
-        :param mask: the new field's bitmask. If negative, the field type's default mask will be used.
-        :param shift_amount: the new field's shift amount.
-        :param offset: the field's offset.
-        :raises JMapException: if a field with the same hash already exists.
+        :param jmap: the JMapInfo container.
+        :param field: the field to be accessed.
         """
-        if not isinstance(defval, field_type.data_type):
-            raise TypeError(f"Default value type {repr(type(defval))} is not expected type {repr(field_type.data_type)}!")
+        self._jmap_ = jmap
+        self._field_ = field
+        self._hash_ = field.hash
+        self._data_type_ = field.type.data_type
 
-        # Calculate hash and check if field with same hash already exists
-        field_hash = self._hash_table_.add(field_name)
+    @property
+    def field(self) -> JMapField:
+        """The field that is accessed."""
+        return self._field_
 
-        if field_hash in self._fields_:
-            raise JMapException(f"Field \"{field_name}\" already exists!")
+    def get(self, entry: JMapEntry):
+        """
+        Returns the field's value of the given entry.
 
-        # Create the actual field
-        mask = field_type.mask if mask < 0 else mask
-        field = JMapField(self, field_hash, field_type, mask, shift_amount, offset, defval)
-        self._fields_[field_hash] = field
+        :param entry: the entry.
+        :return: the field's value.
+        """
+        return entry._data_[self._hash_]
 
-        # Set default values for all entries
-        for entry in self._entries_:
-            entry._data_[field_hash] = field.default
+    __call__ = get
 
-    def drop_field(self, field_key):
+    def set(self, entry: JMapEntry, value):
         """
-        Drops the field with the specified key (hash or name) and remove's the field's data from all entries.
+        Sets the field's value of the given entry.
 
-        :param field_key: the field's key (hash or name).
+        :param entry: the entry.
+        :param value: the new value.
+        :raises TypeError: if the value's type does not match the field's data type.
         """
-        def dropfield0(field_hash):
-            field = self._fields_[field_hash]
-            field._jmap_ = None  # Unlink
-            del self._fields_[field_hash]
+        if type(value) is not self._data_type_:
+            raise TypeError(f"Wrong data type for field [{self._hash_:08X}]: Expected {self._data_type_}, found {type(value)} instead.")
 
-            for entry in self._entries_:
-                del entry._data_[field_hash]
+        if self._jmap_._share_ is not None:
+            self._jmap_._unshare_()
 
-        if isinstance(field_key, str):
-            field_hash = self._hash_table_.calc(field_key)
+        entry._data_[self._hash_] = value
 
-            if field_hash not in self._fields_:
-                raise KeyError(f"Field \"{field_key}\" does not exist!")
-            else:
-                dropfield0(field_hash)
-        elif isinstance(field_key, int):
-            if field_key not in self._fields_:
-                raise KeyError(f"Field [{field_key:08X}] does not exist!")
-            else:
-                dropfield0(field_key)
-        else:
-            raise TypeError("Key must be a str or int!")
+        if self._jmap_._indexes_:
+            self._jmap_._invalidate_indexes_(self._hash_)
 
-    def create_entry(self) -> JMapEntry:
-        """
-        Creates a new entry, populates it with default values for all fields and appends it at the end of the container.
+    def __getitem__(self, index: int):
+        columns = self._jmap_._columns_
 
-        :return: the newly created entry.
-        """
-        entry = JMapEntry(self)
+        if columns is not None and not isinstance(self._jmap_._entries_, _JMapLazyEntries):
+            return columns[self._hash_][index]
+        else:
+            return self._jmap_._entries_[index]._data_[self._hash_]
 
-        for field in self._fields_.values():
-            entry._data_[field.hash] = field.default
+    def __setitem__(self, index: int, value):
+        self.set(self._jmap_._entries_[index], value)
 
-        self._entries_.append(entry)
 
-        return entry
+class JMapIndex:
+    """
+    A secondary index over a single field's values that speeds up finding entries by value. Hash indexes answer equality
+    lookups in O(1), sorted indexes additionally answer range queries in O(log n). The index is kept up to date with its
+    container: any change to the entries or the field's values marks it as outdated, and it is rebuilt on the next
+    lookup. A field can have one hash index and one sorted index at the same time. Once an index is replaced or dropped,
+    it is detached from its container and cannot be used anymore. Indexes should be created using JMapInfo's
+    create_index method.
+
+    index = info.create_index("name")
+    entry = index.get("AstroGalaxy")
+    """
+    __slots__ = ("_jmap_", "_field_", "_sorted_", "_dirty_", "_rows_", "_keys_")
 
-    def remove_entry(self, index: int):
+    def __init__(self, jmap, field: JMapField, is_sorted: bool):
         """
-        Removes and unlinks the entry at the given index.
+        Constructs a new index for the given field of the specified JMapInfo container. This should not be called
+        directly. Instead, use JMapInfo's create_index method.
 
-        :param index: the entry's index.
+        :param jmap: the JMapInfo container.
+        :param field: the field to be indexed.
+        :param is_sorted: whether to create a sorted index.
         """
-        entry = self._entries_[index]
+        self._jmap_ = jmap
+        self._field_ = field
+        self._sorted_ = is_sorted
+        self._dirty_ = True
+        self._rows_ = None  # Maps values to row indices, or row indices ordered by value if sorted
+        self._keys_ = None  # Values ordered like the row indices if sorted
+
+    @property
+    def field(self) -> JMapField:
+        """The field that is indexed."""
+        return self._field_
+
+    @property
+    def sorted(self) -> bool:
+        """Whether the index is sorted and supports range queries."""
+        return self._sorted_
+
+    def _detach_(self):
+        self._jmap_ = None
+        self._rows_ = None
+        self._keys_ = None
+
+    def _build_(self):
+        if self._jmap_ is None:
+            raise JMapException(f"Index for field [{self._field_.hash:08X}] was dropped!")
+
+        values = self._jmap_._get_values_(self._field_.hash)
+
+        if self._sorted_:
+            self._rows_ = sorted(range(len(values)), key=values.__getitem__)
+            self._keys_ = [values[i] for i in self._rows_]
+        else:
+            rows = dict()
+
+            for i, value in enumerate(values):
+                rows.setdefault(value, []).append(i)
+
+            self._rows_ = rows
+
+        self._dirty_ = False
+
+    def _find_rows_(self, value):
+        if self._dirty_ or self._jmap_ is None:
+            self._build_()
+
+        if self._sorted_:
+            start = bisect.bisect_left(self._keys_, value)
+            stop = bisect.bisect_right(self._keys_, value, start)
+            return self._rows_[start:stop]
+
+        return self._rows_.get(value, ())
+
+    def find(self, value) -> list:
+        """
+        Returns all entries whose value for the indexed field equals the given value, in the order of the container.
+
+        :param value: the value to look for.
+        :return: the list of matching entries.
+        """
+        rows = self._find_rows_(value)
+        entries = self._jmap_._entries_
+        return [entries[i] for i in sorted(rows)]
+
+    def get(self, value, default=None):
+        """
+        Returns the first entry whose value for the indexed field equals the given value.
+
+        :param value: the value to look for.
+        :param default: the value to return if no entry matches.
+        :return: the first matching entry, or the default value.
+        """
+        rows = self._find_rows_(value)
+        return self._jmap_._entries_[min(rows)] if rows else default
+
+    def range(self, start=None, stop=None, reverse: bool = False) -> list:
+        """
+        Returns all entries whose value for the indexed field lies between start (inclusive) and stop (exclusive),
+        ordered by value. A bound of None is unlimited.
+
+        :param start: the lower bound.
+        :param stop: the upper bound.
+        :param reverse: whether to return the entries in descending order.
+        :return: the list of matching entries.
+        :raises JMapException: if the index is not sorted or was dropped.
+        """
+        if not self._sorted_:
+            raise JMapException("Range queries require a sorted index!")
+
+        if self._dirty_ or self._jmap_ is None:
+            self._build_()
+
+        low = 0 if start is None else bisect.bisect_left(self._keys_, start)
+        high = len(self._keys_) if stop is None else bisect.bisect_left(self._keys_, stop, low)
+        entries = self._jmap_._entries_
+        rows = self._rows_[low:high]
+
+        return [entries[i] for i in (reversed(rows) if reverse else rows)]
+
+    def __contains__(self, value):
+        return len(self._find_rows_(value)) > 0
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Compiled row codecs
+# ----------------------------------------------------------------------------------------------------------------------
+class _JMapStringPoolReader:
+    """
+    Decodes strings of STRING_OFFSET fields from the string pool of a JMap buffer. Every distinct offset is decoded
+    exactly once and the decoded strings are interned, so that repeated values share the same string object.
+    """
+
+    def __init__(self, data, off_strings: int, encoding: str):
+        self._data_ = data
+        self._off_strings_ = off_strings
+        self._encoding_ = encoding
+        self._strings_ = dict()
+
+    def decode(self, offsets) -> list:
+        """
+        Decodes the strings at the given offsets relative to the start of the string pool.
+
+        :param offsets: the sequence of string offsets.
+        :return: the list of decoded strings.
+        """
+        profiler = __PROFILER_STATE__.profiler
+        start = time.perf_counter() if profiler is not None else 0.0
+        strings = self._strings_
+        data = self._data_
+        missing = set(offsets).difference(strings)
+
+        for off_string in missing:
+            off_val = self._off_strings_ + off_string
+            end = data.find(b"\0", off_val)
+            end = len(data) if end < 0 else end
+            strings[off_string] = sys.intern(data[off_val:end].decode(self._encoding_))
+
+        values = [strings[off_string] for off_string in offsets]
+
+        if profiler is not None:
+            profiler.record("decode_strings", time.perf_counter() - start, strings=len(offsets), decoded=len(missing),
+                            dedup_hits=len(offsets) - len(missing))
+
+        return values
+
+
+class _JMapStringPoolBuilder:
+    """
+    Collects the strings of STRING_OFFSET fields while packing entries. Every distinct string is encoded and stored
+    only once, and the returned offsets are relative to the start of the string pool.
+    """
+
+    def __init__(self, encoding: str):
+        self._encoding_ = encoding
+        self._terminator_ = "\0".encode(encoding)
+        self._offsets_ = dict()
+        self._chunks_ = list()
+        self._size_ = 0
+
+    def __len__(self):
+        return self._size_
+
+    def add(self, string: str) -> int:
+        off_string = self._offsets_.get(string)
+
+        if off_string is None:
+            off_string = self._size_
+            self._offsets_[string] = off_string
+
+            # shift_jis appears to truncate the zero terminator sometimes...
+            enc_string = string.encode(self._encoding_)
+            self._chunks_.append(enc_string)
+            self._chunks_.append(self._terminator_)
+            self._size_ += len(enc_string) + len(self._terminator_)
+
+        return off_string
+
+    def data(self) -> bytes:
+        return b"".join(self._chunks_)
+
+
+class _JMapRowCodec:
+    """
+    Decodes and encodes whole entries of a specific field layout. The layout is compiled once into storage slots, which
+    are read and written by a single structure covering the entire entry. Bit-packed fields that share a slot are
+    extracted using precomputed masks, shift amounts and sign bits, and are merged into a single word when packing. If
+    slots overlap in incompatible ways, every slot is accessed using its own structure instead. Codecs should be
+    retrieved using _get_row_codec_ so that they are shared between tables.
+    """
+
+    # Struct format codes for each field type: (unsigned, signed)
+    __CODES__ = {
+        JMapFieldType.LONG: ("I", "i"),
+        JMapFieldType.STRING: ("32s", "32s"),
+        JMapFieldType.FLOAT: ("f", "f"),
+        JMapFieldType.UNSIGNED_LONG: ("I", "i"),
+        JMapFieldType.SHORT: ("H", "h"),
+        JMapFieldType.CHAR: ("B", "b"),
+        JMapFieldType.STRING_OFFSET: ("I", "I")
+    }
+    __INTEGRAL__ = (JMapFieldType.LONG, JMapFieldType.UNSIGNED_LONG, JMapFieldType.SHORT, JMapFieldType.CHAR)
+
+    def __init__(self, layout: tuple, entry_size: int, is_big_endian: bool):
+        """
+        Compiles a new row codec. The layout is a tuple that contains the type, mask, shift amount and offset of every
+        column in the order of the field table.
+
+        :param layout: the tuple of (type, mask, shift amount, offset) for every column.
+        :param entry_size: the size of a single entry.
+        :param is_big_endian: the endianness of the data.
+        :raises JMapException: when a field exceeds the entry size.
+        """
+        endian = ">" if is_big_endian else "<"
+        self._entry_size_ = entry_size
+
+        # Group columns by storage slot. Bit-packed fields with the same offset and storage type share the same slot.
+        slot_columns = dict()
+
+        for i, (field_type, mask, shift, offset) in enumerate(layout):
+            slot_columns.setdefault((offset, self.__CODES__[field_type][0]), []).append(i)
+
+        slot_keys = sorted(slot_columns, key=lambda k: k[0])
+        slot_codes = [code for _, code in slot_keys]
+        self._num_slots_ = len(slot_keys)
+        self._columns_ = [None] * len(layout)
+        self._pack_plan_ = [None] * len(layout)
+
+        for slot, slot_key in enumerate(slot_keys):
+            users = slot_columns[slot_key]
+
+            for i in users:
+                field_type, mask, shift, offset = layout[i]
+                fixup = None
+
+                if field_type in self.__INTEGRAL__:
+                    # A sole field without masking or shifting can be read as a signed value right away
+                    if len(users) == 1 and shift == 0 and mask & field_type.mask == field_type.mask:
+                        slot_codes[slot] = self.__CODES__[field_type][1]
+                    else:
+                        sign = 1 << (field_type.size * 8 - 1)
+                        sign = sign if ((field_type.mask & mask) >> shift) & sign else 0
+                        fixup = (mask, shift, sign)
+
+                self._columns_[i] = (field_type, slot, fixup)
+                self._pack_plan_[i] = (field_type, slot, mask & field_type.mask, shift)
+
+        # Check if all slots can be accessed using a single structure
+        slot_spans = [(offset, struct.calcsize(endian + code)) for offset, code in slot_keys]
+        end = 0
+        overlapping = False
+
+        for offset, size in slot_spans:
+            overlapping |= offset < end
+            end = max(end, offset + size)
+
+        if end > entry_size:
+            raise JMapException(f"Field data exceeds entry size of 0x{entry_size:X} bytes!")
+
+        if overlapping:
+            self._struct_ = None
+            self._pack_struct_ = None
+            self._slot_structs_ = [
+                struct.Struct(f"{endian}{offset}x{code}{entry_size - offset - size}x")
+                for (offset, size), code in zip(slot_spans, slot_codes)
+            ]
+            self._slot_packers_ = [(struct.Struct(endian + code), offset) for offset, code in slot_keys]
+        else:
+            fmt_unpack = fmt_pack = endian
+            end = 0
+
+            for (offset, size), code, (_, pack_code) in zip(slot_spans, slot_codes, slot_keys):
+                fmt_unpack += f"{offset - end}x{code}"
+                fmt_pack += f"{offset - end}x{pack_code}"
+                end = offset + size
+
+            self._struct_ = struct.Struct(f"{fmt_unpack}{entry_size - end}x")
+            self._pack_struct_ = struct.Struct(f"{fmt_pack}{entry_size - end}x")
+            self._slot_structs_ = None
+            self._slot_packers_ = None
+
+    def unpack_columns(self, data, off: int, count: int, string_pool: _JMapStringPoolReader, encoding: str) -> list:
+        """
+        Decodes the given number of entries starting at the specified offset and returns a list of value sequences for
+        every column of the layout.
+
+        :param data: the byte buffer.
+        :param off: the offset to the first entry.
+        :param count: the number of entries.
+        :param string_pool: the reader for the string pool.
+        :param encoding: the encoding for strings.
+        :return: the list of decoded columns.
+        """
+        if count == 0 or not self._columns_:
+            return [() for _ in self._columns_]
+
+        profiler = __PROFILER_STATE__.profiler
+        start = time.perf_counter() if profiler is not None else 0.0
+
+        with memoryview(data) as view, view[off:off + count * self._entry_size_] as rows:
+            if self._struct_ is not None:
+                slot_values = list(zip(*self._struct_.iter_unpack(rows)))
+            else:
+                slot_values = [[val for val, in strct.iter_unpack(rows)] for strct in self._slot_structs_]
+
+        columns = list()
+
+        for field_type, slot, fixup in self._columns_:
+            values = slot_values[slot]
+
+            # Extract bit-packed data and apply sign extension
+            if fixup is not None:
+                mask, shift, sign = fixup
+                values = [(val & mask) >> shift for val in values]
+
+                if sign:
+                    wrap = sign << 1
+                    values = [val - wrap if val & sign else val for val in values]
+
+            # Decode embedded strings, every distinct string is decoded only once
+            elif field_type is JMapFieldType.STRING:
+                strings = {val: sys.intern(val.split(b"\0", 1)[0].decode(encoding)) for val in set(values)}
+                values = [strings[val] for val in values]
+
+            # Decode strings from the string pool
+            elif field_type is JMapFieldType.STRING_OFFSET:
+                values = string_pool.decode(values)
+
+            columns.append(values)
+
+        if profiler is not None:
+            profiler.record("decode_entries", time.perf_counter() - start, rows=count, bytes=count * self._entry_size_)
+
+        return columns
+
+    def pack_columns(self, buffer, off: int, columns: list, string_pool: _JMapStringPoolBuilder, encoding: str):
+        """
+        Encodes the given columns into the zero-initialized buffer starting at the specified offset. Every column has
+        to contain the values of all entries in the order of the layout. Strings for STRING_OFFSET fields are added to
+        the string pool in row-major order.
+
+        :param buffer: the writable byte buffer.
+        :param off: the offset to the first entry.
+        :param columns: the list of value sequences for every column.
+        :param string_pool: the string pool to add strings to.
+        :param encoding: the encoding for strings.
+        """
+        if not columns or not columns[0]:
+            return
+
+        profiler = __PROFILER_STATE__.profiler
+        start = time.perf_counter() if profiler is not None else 0.0
+        num_rows = len(columns[0])
+        num_pooled = len(string_pool._offsets_)
+        columns = list(columns)
+
+        # Resolve pool offsets and encode embedded strings
+        string_columns = [i for i, plan in enumerate(self._pack_plan_) if plan[0] is JMapFieldType.STRING_OFFSET]
+
+        if string_columns:
+            num_strings = len(string_columns)
+            offsets = [string_pool.add(val) for row in zip(*[columns[i] for i in string_columns]) for val in row]
+
+            for j, i in enumerate(string_columns):
+                columns[i] = offsets[j::num_strings]
+
+        for i, plan in enumerate(self._pack_plan_):
+            if plan[0] is JMapFieldType.STRING:
+                columns[i] = [val.encode(encoding) for val in columns[i]]
+
+                if any(len(enc_string) >= 32 for enc_string in columns[i]):
+                    warnings.warn("String is too long to be embedded. String will be chopped to fit 32 bytes!")
+
+        off_tmp = off
+
+        # Merge bit-packed fields into their slots and pack every row at once
+        if self._pack_struct_ is not None:
+            slot_values = [None] * self._num_slots_
+
+            for (field_type, slot, mask, shift), values in zip(self._pack_plan_, columns):
+                if field_type in self.__INTEGRAL__:
+                    prev = slot_values[slot]
+
+                    if prev is None or field_type is JMapFieldType.CHAR:
+                        values = [(val << shift) & mask for val in values]
+                    else:
+                        inv_mask = ~mask
+                        values = [(word & inv_mask) | ((val << shift) & mask) for word, val in zip(prev, values)]
+
+                slot_values[slot] = values
+
+            strct = self._pack_struct_
+
+            for row in zip(*[values for values in slot_values if values is not None]):
+                strct.pack_into(buffer, off_tmp, *row)
+                off_tmp += self._entry_size_
+
+        # Overlapping slots are written field by field
+        else:
+            for row in zip(*columns):
+                for (field_type, slot, mask, shift), val in zip(self._pack_plan_, row):
+                    strct, off_val = self._slot_packers_[slot]
+                    off_val += off_tmp
+
+                    if field_type is JMapFieldType.CHAR:
+                        val = (val << shift) & mask
+                    elif field_type in self.__INTEGRAL__:
+                        val = (strct.unpack_from(buffer, off_val)[0] & ~mask) | ((val << shift) & mask)
+
+                    strct.pack_into(buffer, off_val, val)
+
+                off_tmp += self._entry_size_
+
+        if profiler is not None:
+            num_cells = num_rows * len(string_columns)
+            num_unique = len(string_pool._offsets_) - num_pooled
+            profiler.record("encode_entries", time.perf_counter() - start, rows=num_rows,
+                            bytes=num_rows * self._entry_size_, strings=num_cells, unique_strings=num_unique,
+                            dedup_hits=num_cells - num_unique, pool_bytes=len(string_pool))
+
+
+@functools.lru_cache(maxsize=256)
+def _get_row_codec_(layout: tuple, entry_size: int, is_big_endian: bool) -> _JMapRowCodec:
+    return _JMapRowCodec(layout, entry_size, is_big_endian)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Lazily decoded entries
+# ----------------------------------------------------------------------------------------------------------------------
+__DECODE_CHUNK_SIZE__ = 256  # Number of entries that are decoded at once while iterating
+
+
+class _JMapLazyEntries:
+    """
+    A read-only sequence of entries that are decoded on demand straight from the underlying buffer. Entries are decoded
+    only once and are kept afterwards, so that changes to them are preserved. Any operation that changes the structure
+    of the container replaces this sequence with a fully decoded list by calling materialize.
+    """
+
+    def __init__(self, jmap, data, off: int, count: int, codec, off_strings: int, encoding: str):
+        self._jmap_ = jmap
+        self._data_ = data
+        self._off_ = off
+        self._count_ = count
+        self._codec_ = codec
+        self._string_pool_ = _JMapStringPoolReader(data, off_strings, encoding)
+        self._encoding_ = encoding
+        self._field_hashes_ = tuple(field.hash for field in jmap._data_fields_())
+        self._decoded_ = dict()
+
+    def __len__(self):
+        return self._count_
+
+    def __iter__(self):
+        for start in range(0, self._count_, __DECODE_CHUNK_SIZE__):
+            stop = min(start + __DECODE_CHUNK_SIZE__, self._count_)
+            self._decode_range_(start, stop)
+
+            for i in range(start, stop):
+                yield self._decoded_[i]
+
+    def __reversed__(self):
+        for i in reversed(range(self._count_)):
+            yield self[i]
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(self._count_))]
+
+        index = key + self._count_ if key < 0 else key
+
+        if index < 0 or index >= self._count_:
+            raise IndexError("list index out of range")
+
+        if index not in self._decoded_:
+            self._decode_range_(index, index + 1)
+
+        return self._decoded_[index]
+
+    def _decode_columns_(self, start: int, stop: int) -> list:
+        if self._codec_ is None:
+            return list()
+
+        off = self._off_ + start * self._codec_._entry_size_
+        return self._codec_.unpack_columns(self._data_, off, stop - start, self._string_pool_, self._encoding_)
+
+    def _decode_range_(self, start: int, stop: int):
+        columns = self._decode_columns_(start, stop)
+        rows = zip(*columns) if columns else [()] * (stop - start)
+
+        for i, row in enumerate(rows, start):
+            if i not in self._decoded_:
+                entry = JMapEntry(self._jmap_)
+                entry._data_ = dict(zip(self._field_hashes_, row))
+                self._decoded_[i] = entry
+
+    def materialize(self) -> list:
+        """
+        Decodes all remaining entries, releases the underlying buffer and returns the list of all entries. Entries that
+        have been decoded already are kept in order to preserve their identity and changes.
+
+        :return: the list of all entries.
+        """
+        jmap = self._jmap_
+        columns = [list(values) for values in self._decode_columns_(0, self._count_)]
+        entries = list()
+
+        # Transfer already decoded entries into the columns
+        if jmap._columns_ is not None:
+            for i, entry in self._decoded_.items():
+                for values, field_hash in zip(columns, self._field_hashes_):
+                    values[i] = entry._data_[field_hash]
+
+            for field, values in zip(jmap._data_fields_(), columns):
+                jmap._columns_[field.hash] = _make_column_(field.type, values)
+
+            for i in range(self._count_):
+                entry = self._decoded_.get(i) or JMapEntry(jmap)
+                entry._data_ = _JMapColumnRow(jmap._columns_, i)
+                entries.append(entry)
+        else:
+            rows = zip(*columns) if columns else [()] * self._count_
+
+            for i, row in enumerate(rows):
+                entry = self._decoded_.get(i)
+
+                if entry is None:
+                    entry = JMapEntry(jmap)
+                    entry._data_ = dict(zip(self._field_hashes_, row))
+
+                entries.append(entry)
+
+        self.release()
+        return entries
+
+    def release(self):
+        """Releases the underlying buffer and closes it if it is a memory-mapped file."""
+        if isinstance(self._data_, mmap.mmap):
+            self._data_.close()
+
+        self._data_ = None
+        self._string_pool_ = None
+        self._decoded_.clear()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Copy-on-write entries
+# ----------------------------------------------------------------------------------------------------------------------
+class _JMapShare:
+    """
+    A token that is held by all containers whose data is shared, see JMapInfo.copy. It counts the number of containers
+    that still use the shared data, so that the last one can take ownership of the data without copying it.
+    """
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 1
+
+
+class _JMapSharedEntries:
+    """
+    A read-only sequence of entries of a copied container. The entries' data is shared with the original container:
+    in column-wise containers the columns are shared, otherwise the rows' dictionaries. Entries are created on demand
+    and are kept afterwards. Changing values only requires the rows to be copied, see copy_rows. Any operation that
+    changes the structure of the container replaces this sequence with a list of entries by calling materialize.
+    """
+
+    def __init__(self, jmap, rows, count: int):
+        self._jmap_ = jmap
+        self._rows_ = rows  # Shared dictionaries of all rows, or None if the container stores its data column-wise
+        self._count_ = count
+        self._created_ = dict()
+
+    def __len__(self):
+        return self._count_
+
+    def __iter__(self):
+        for i in range(self._count_):
+            yield self[i]
+
+    def __reversed__(self):
+        for i in reversed(range(self._count_)):
+            yield self[i]
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(self._count_))]
+
+        index = key + self._count_ if key < 0 else key
+
+        if index < 0 or index >= self._count_:
+            raise IndexError("list index out of range")
+
+        entry = self._created_.get(index)
+
+        if entry is None:
+            entry = JMapEntry(self._jmap_)
+
+            if self._rows_ is None:
+                entry._data_ = _JMapColumnRow(self._jmap_._columns_, index)
+            else:
+                entry._data_ = self._rows_[index]
+
+            self._created_[index] = entry
+
+        return entry
+
+    def copy_rows(self):
+        """
+        Copies the rows' dictionaries so that the entries own their data. All rows are copied right away, as the other
+        containers may take ownership of the shared rows and change them in place afterwards.
+        """
+        if self._rows_ is not None:
+            self._rows_ = [row.copy() for row in self._rows_]
+
+            for index, entry in self._created_.items():
+                entry._data_ = self._rows_[index]
+
+    def materialize(self) -> list:
+        """
+        Creates all remaining entries and returns the list of all entries. Entries that have been created already are
+        kept in order to preserve their identity.
+
+        :return: the list of all entries.
+        """
+        entries = [self[i] for i in range(self._count_)]
+        self._rows_ = None
+        self._created_.clear()
+        return entries
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# JMapInfo implementation according to the BCSV / JMap format
+# ----------------------------------------------------------------------------------------------------------------------
+class JMapInfo:
+    """
+    The table-like JMap container that consists of individual fields and entries. Provides high-level access to entries.
+    A hash lookup table is used to retrieve proper names for fields.
+    """
+
+    # Structures for parsing and packing
+    __STRUCT_BE__ = struct.Struct(">4I")  # Big-endian
+    __STRUCT_LE__ = struct.Struct("<4I")  # Little-endian
+
+    def __init__(self, hash_table: JMapHashTable, columnar: bool = False):
+        """
+        Constructs a new JMapInfo container with no fields or entries. The specified lookup hash table will be used to
+        retrieve proper names for hashes. If columnar is True, the data is stored column-wise. Numeric fields are then
+        kept in typed arrays, strings in lists, and entries are lightweight views onto their row. This greatly reduces
+        memory usage for large tables and makes adding or dropping fields cheap.
+
+        :param hash_table: the hash lookup table to be used.
+        :param columnar: whether to store the data column-wise.
+        """
+        self._fields_ = dict()          # Maps fields to hashes for quick access.
+        self._entries_ = list()         # List of actual entries.
+        self._hash_table_ = hash_table  # The lookup hash table that is used to retrieve proper field names.
+        self._entry_size_ = -1          # Size of a single entry.
+        self.manual_offsets = False     # Requires manually-specified field offsets. Necessary for PA collision data.
+        self._columns_ = dict() if columnar else None  # Maps hashes to columns if the data is stored column-wise.
+        self._projection_ = None        # Fields whose data was decoded if only some fields were decoded.
+        self._indexes_ = dict()         # Maps pairs of hashes and sortedness to secondary indexes.
+        self._share_ = None             # Token if the data is shared with copies of this container.
+
+    @property
+    def hash_table(self):
+        """
+        Returns the hash lookup table used by this container.
+
+        :return: the hash lookup table.
+        """
+        return self._hash_table_
+
+    @property
+    def fields(self) -> tuple:
+        """
+        Returns a tuple of all fields in this container.
+
+        :return: the tuple of all fields.
+        """
+        return tuple(self._fields_.values())
+
+    @property
+    def columnar(self) -> bool:
+        """
+        Returns whether the data is stored column-wise.
+
+        :return: True if the data is stored column-wise, otherwise False.
+        """
+        return self._columns_ is not None
+
+    @property
+    def projected(self) -> bool:
+        """
+        Returns whether only some fields were decoded. In that case, entries contain data for the decoded fields only
+        while all fields remain accessible. Such containers cannot be packed.
+
+        :return: True if only some fields were decoded, otherwise False.
+        """
+        return self._projection_ is not None
+
+    def __iter__(self):
+        return iter(self._entries_)
+
+    def __reversed__(self):
+        return reversed(self._entries_)
+
+    def __repr__(self):
+        return repr(self._entries_)
+
+    def __len__(self):
+        return len(self._entries_)
+
+    def __getitem__(self, key):
+        return self._entries_[key]
+
+    def __delitem__(self, key):
+        self._materialize_()
+
+        if isinstance(key, slice):
+            for entry in self._entries_[key]:
+                self._unlink_entry_(entry)
+        else:
+            self._unlink_entry_(self._entries_[key])
+
+        del self._entries_[key]
+
+        if self._columns_ is not None:
+            for column in self._columns_.values():
+                del column[key]
+
+            self._reindex_rows_()
+
+        self._invalidate_indexes_()
+
+    def __contains__(self, field_key):
+        if isinstance(field_key, str):
+            return self._hash_table_.calc(field_key) in self._fields_
+        elif isinstance(field_key, int):
+            return field_key in self._fields_
+        else:
+            raise TypeError("Key must be a str or int!")
+
+    def get_field(self, field_key) -> JMapField:
+        """
+        Retrieves the field using the specified key (hash or name) and remove's the field's data from all entries.
+
+        :param field_key: the field's key (hash or name).
+        :return: the field that corresponds to the key.
+        """
+        if isinstance(field_key, str):
+            field_hash = self._hash_table_.calc(field_key)
+
+            if field_hash not in self._fields_:
+                raise KeyError(f"Entry does not contain the field \"{field_key}\"")
+            else:
+                return self._fields_[field_hash]
+        elif isinstance(field_key, int):
+            if field_key not in self._fields_:
+                raise KeyError(f"Entry does not contain the field [{field_key}]")
+            else:
+                return self._fields_[field_key]
+        else:
+            raise TypeError("Key must be a str or int!")
+
+    def accessor(self, field_key) -> JMapAccessor:
+        """
+        Creates an accessor for the field with the specified key (hash or name). The accessor resolves the field only
+        once and provides fast access to the field's values.
+
+        :param field_key: the field's key (hash or name).
+        :return: the accessor for the field.
+        """
+        return JMapAccessor(self, self.get_field(field_key))
+
+    def create_index(self, field_key, sorted: bool = False) -> JMapIndex:
+        """
+        Creates a secondary index over the values of the field with the specified key (hash or name). Hash indexes
+        find entries by value in O(1), while sorted indexes also support range queries in O(log n). The index is built
+        on first use and rebuilt lazily whenever the entries or the field's values change. A field can have one index
+        of each kind. Any existing index of the same kind for the field will be replaced and detached.
+
+        :param field_key: the field's key (hash or name).
+        :param sorted: whether to create a sorted index.
+        :return: the index for the field.
+        :raises JMapException: if the field's data was not decoded.
+        """
+        field = self.get_field(field_key)
+
+        if field not in self._data_fields_():
+            raise JMapException(f"Cannot index field [{field.hash:08X}] whose data was not decoded!")
+
+        index = JMapIndex(self, field, sorted)
+        self._drop_indexes_(field.hash, sorted)
+        self._indexes_[(field.hash, sorted)] = index
+        return index
+
+    def get_index(self, field_key, sorted: bool = None):
+        """
+        Retrieves the secondary index for the field with the specified key (hash or name). If sorted is None, the hash
+        index is preferred over the sorted index.
+
+        :param field_key: the field's key (hash or name).
+        :param sorted: the kind of index to retrieve, or None for any kind.
+        :return: the index for the field, or None if the field is not indexed.
+        """
+        field_hash = self.get_field(field_key).hash
+
+        if sorted is None:
+            return self._indexes_.get((field_hash, False)) or self._indexes_.get((field_hash, True))
+
+        return self._indexes_.get((field_hash, sorted))
+
+    def drop_index(self, field_key, sorted: bool = None):
+        """
+        Drops the secondary index for the field with the specified key (hash or name) if it exists. The dropped index
+        is detached and cannot be used anymore.
+
+        :param field_key: the field's key (hash or name).
+        :param sorted: the kind of index to drop, or None to drop both kinds.
+        """
+        self._drop_indexes_(self.get_field(field_key).hash, sorted)
+
+    def _drop_indexes_(self, field_hash: int, sorted: bool = None):
+        for kind in ((False, True) if sorted is None else (sorted,)):
+            index = self._indexes_.pop((field_hash, kind), None)
+
+            if index is not None:
+                index._detach_()
+
+    def create_field(self, field_name, field_type: JMapFieldType, defval, mask: int = -1, shift_amount: int = 0, offset: int = 0):
+        """
+        Creates a new field with the given name, type, mask and shift amount. This also sets the field's data to the
+        default value for every entry. If a field with the same hash already exists, a JMapException will be raised. The
+        field's offset should only be provided when the JMapInfo container uses manually-specified field offsets.
+
+        :param field_name: the new field's name.
+        :param field_type: the new field's data type.
+        :param defval: the new field's default value.
+        :param mask: the new field's bitmask. If negative, the field type's default mask will be used.
+        :param shift_amount: the new field's shift amount.
+        :param offset: the field's offset.
+        :raises JMapException: if a field with the same hash already exists.
+        """
+        if not isinstance(defval, field_type.data_type):
+            raise TypeError(f"Default value type {repr(type(defval))} is not expected type {repr(field_type.data_type)}!")
+
+        # Calculate hash and check if field with same hash already exists
+        field_hash = self._hash_table_.add(field_name)
+
+        if field_hash in self._fields_:
+            raise JMapException(f"Field \"{field_name}\" already exists!")
+
+        self._materialize_()
+
+        # Create the actual field
+        mask = field_type.mask if mask < 0 else mask
+        field = JMapField(self, field_hash, field_type, mask, shift_amount, offset, defval)
+        self._fields_[field_hash] = field
+
+        if self._projection_ is not None:
+            self._projection_ += (field,)
+
+        # Set default values for all entries
+        if self._columns_ is not None:
+            self._columns_[field_hash] = _make_column_(field_type, [field.default]) * len(self._entries_)
+        else:
+            for entry in self._entries_:
+                entry._data_[field_hash] = field.default
+
+    def drop_field(self, field_key):
+        """
+        Drops the field with the specified key (hash or name) and remove's the field's data from all entries.
+
+        :param field_key: the field's key (hash or name).
+        """
+        def dropfield0(field_hash):
+            self._materialize_()
+            field = self._fields_[field_hash]
+            field._jmap_ = None  # Unlink
+            del self._fields_[field_hash]
+            self._drop_indexes_(field_hash)
+
+            if self._projection_ is not None:
+                if field not in self._projection_:
+                    return
+
+                self._projection_ = tuple(f for f in self._projection_ if f is not field)
+
+            if self._columns_ is not None:
+                del self._columns_[field_hash]
+            else:
+                for entry in self._entries_:
+                    del entry._data_[field_hash]
+
+        if isinstance(field_key, str):
+            field_hash = self._hash_table_.calc(field_key)
+
+            if field_hash not in self._fields_:
+                raise KeyError(f"Field \"{field_key}\" does not exist!")
+            else:
+                dropfield0(field_hash)
+        elif isinstance(field_key, int):
+            if field_key not in self._fields_:
+                raise KeyError(f"Field [{field_key:08X}] does not exist!")
+            else:
+                dropfield0(field_key)
+        else:
+            raise TypeError("Key must be a str or int!")
+
+    def create_entry(self) -> JMapEntry:
+        """
+        Creates a new entry, populates it with default values for all fields and appends it at the end of the container.
+
+        :return: the newly created entry.
+        """
+        self._materialize_()
+        entry = JMapEntry(self)
+
+        if self._columns_ is not None:
+            for field_hash, column in self._columns_.items():
+                try:
+                    column.append(self._fields_[field_hash].default)
+                except OverflowError:
+                    _widen_column_(self._columns_, field_hash).append(self._fields_[field_hash].default)
+
+            entry._data_ = _JMapColumnRow(self._columns_, len(self._entries_))
+        else:
+            for field in self._data_fields_():
+                entry._data_[field.hash] = field.default
+
+        self._entries_.append(entry)
+        self._invalidate_indexes_()
+
+        return entry
+
+    def extend(self, rows):
+        """
+        Appends new entries for all of the given rows. A row is either a sequence that contains a value for every field,
+        ordered like the fields, or a dictionary that maps field keys (hashes or names) to values. Fields that are not
+        specified in a dictionary are set to their default values. The values' data types are validated per field for
+        all rows at once, and no entries are added if any value is invalid.
+
+        :param rows: the iterable of rows.
+        :raises TypeError: if a value's type does not match the field's data type.
+        :raises JMapException: if a sequence does not contain a value for every field or if a dictionary contains a field
+            whose data was not decoded.
+        """
+        fields = self._data_fields_()
+        rows = list(rows)
+        positions = dict()  # Maps dictionary keys to positions of fields
+        defaults = [field.default for field in fields]
+
+        for i, row in enumerate(rows):
+            if isinstance(row, dict):
+                values = list(defaults)
+
+                for field_key, value in row.items():
+                    position = positions.get(field_key)
+
+                    if position is None:
+                        field = self.get_field(field_key)
+
+                        if field not in fields:
+                            raise JMapException(f"Cannot set values of field [{field.hash:08X}] whose data was not decoded!")
+
+                        position = positions[field_key] = fields.index(field)
+
+                    values[position] = value
+
+                rows[i] = values
+
+        invalid_lengths = set(map(len, rows)).difference((len(fields),))
+
+        if invalid_lengths:
+            raise JMapException(f"Rows must contain {len(fields)} values, but found {invalid_lengths.pop()}!")
+
+        columns = list(zip(*rows)) if fields else list()
+
+        for field, values in zip(fields, columns):
+            _check_column_(field, values)
+
+        self._append_columns_(columns, len(rows))
+
+    def get_column(self, field_key) -> list:
+        """
+        Returns the values of the field with the specified key (hash or name) in all entries, ordered like the entries.
+
+        :param field_key: the field's key (hash or name).
+        :return: the list of values.
+        :raises JMapException: if the field's data was not decoded.
+        """
+        field = self.get_field(field_key)
+
+        if field not in self._data_fields_():
+            raise JMapException(f"Cannot get values of field [{field.hash:08X}] whose data was not decoded!")
+
+        return list(self._get_values_(field.hash))
+
+    def set_column(self, field_key, values):
+        """
+        Sets the values of the field with the specified key (hash or name) in all entries. The values are expected to be
+        ordered like the entries. Their data types are validated at once before any value is changed.
+
+        :param field_key: the field's key (hash or name).
+        :param values: the iterable of new values, one for every entry.
+        :raises TypeError: if a value's type does not match the field's data type.
+        :raises JMapException: if the number of values does not match the number of entries or if the field's data was
+            not decoded.
+        """
+        field = self.get_field(field_key)
+        values = list(values)
+
+        if field not in self._data_fields_():
+            raise JMapException(f"Cannot set values of field [{field.hash:08X}] whose data was not decoded!")
+        if len(values) != len(self._entries_):
+            raise JMapException(f"Expected {len(self._entries_)} values, but found {len(values)}!")
+
+        _check_column_(field, values)
+
+        if self._columns_ is not None:
+            # Replacing the column leaves columns that are shared with copies intact
+            self._materialize_(unshare=False)
+            self._columns_[field.hash] = _make_column_(field.type, values)
+        else:
+            self._materialize_()
+            field_hash = field.hash
+
+            for entry, value in zip(self._entries_, values):
+                entry._data_[field_hash] = value
+
+        self._invalidate_indexes_(field.hash)
+
+    def remove_entry(self, index: int):
+        """
+        Removes and unlinks the entry at the given index.
+
+        :param index: the entry's index.
+        """
+        if not isinstance(index, int):
+            raise TypeError("Index must be an int!")
+
+        del self[index]
+
+    def clear_entries(self):
+        """
+        Removes and unlinks all entries from this container.
+        """
+        if isinstance(self._entries_, _JMapLazyEntries):
+            # Entries that were decoded already keep their data, there is no need to decode the remaining ones
+            for entry in self._entries_._decoded_.values():
+                entry._jmap_ = None
+
+            self._entries_.release()
+            self._entries_ = list()
+
+            # Lazily loaded containers have no columns yet
+            if self._columns_ is not None:
+                for field in self._data_fields_():
+                    self._columns_[field.hash] = _make_column_(field.type, ())
+
+        self._materialize_()
+
+        for entry in self._entries_:
+            self._unlink_entry_(entry)
+
+        self._entries_.clear()
+
+        if self._columns_ is not None:
+            for column in self._columns_.values():
+                del column[:]
+
+        self._invalidate_indexes_()
+
+    def sort_entries(self, key, reverse: bool = False):
+        """
+        Sorts the entries using the given sorting key.
+
+        :param key: the sorting key function.
+        :param reverse: reverse sorting order.
+        """
+        self._materialize_()
+        self._entries_.sort(key=key, reverse=reverse)
+
+        # Reorder all columns according to the new entry order
+        if self._columns_ is not None:
+            order = [entry._data_._index_ for entry in self._entries_]
+
+            for field_hash, column in self._columns_.items():
+                self._columns_[field_hash] = _make_column_(self._fields_[field_hash].type, [column[i] for i in order])
+
+            self._reindex_rows_()
+
+        self._invalidate_indexes_()
+
+    def _data_fields_(self) -> tuple:
+        # Returns the fields whose data is stored in the entries
+        return tuple(self._fields_.values()) if self._projection_ is None else self._projection_
+
+    def _materialize_(self, unshare: bool = True):
+        # Fully decodes lazily loaded entries before the container gets modified. Unless unshare is False, this also
+        # stops sharing the data with copies of this container.
+        if isinstance(self._entries_, _JMapLazyEntries):
+            self._entries_ = self._entries_.materialize()
+
+        if unshare:
+            if self._share_ is not None:
+                self._unshare_()
+
+            if isinstance(self._entries_, _JMapSharedEntries):
+                self._entries_ = self._entries_.materialize()
+
+    def _unshare_(self):
+        # Gives this container its own copy of the data that is shared with other containers. The last container that
+        # uses the shared data takes ownership of it without copying.
+        share = self._share_
+        self._share_ = None
+        share.count -= 1
+        copy_rows = share.count > 0
+
+        if isinstance(self._entries_, _JMapSharedEntries):
+            if copy_rows:
+                self._entries_.copy_rows()
+        elif copy_rows and self._columns_ is None:
+            for entry in self._entries_:
+                entry._data_ = entry._data_.copy()
+
+        if copy_rows and self._columns_ is not None:
+            for field_hash, column in self._columns_.items():
+                self._columns_[field_hash] = column[:]
+
+    def _unlink_entry_(self, entry: JMapEntry):
+        # Detached entries keep a copy of their data as they can no longer access the container's columns
+        if self._columns_ is not None:
+            entry._data_ = entry._data_.copy()
+
         entry._jmap_ = None
-        del self._entries_[index]
 
-    def clear_entries(self):
+    def _get_values_(self, field_hash: int):
+        # Returns the sequence of a field's values in all entries
+        if self._columns_ is not None and not isinstance(self._entries_, _JMapLazyEntries):
+            return self._columns_[field_hash]
+
+        return [entry._data_[field_hash] for entry in self._entries_]
+
+    def _invalidate_indexes_(self, field_hash: int = None):
+        # Marks the indexes as outdated, either the one for a specific field or all of them
+        if field_hash is None:
+            for index in self._indexes_.values():
+                index._dirty_ = True
+        else:
+            for kind in (False, True):
+                if (field_hash, kind) in self._indexes_:
+                    self._indexes_[(field_hash, kind)]._dirty_ = True
+
+    def _reindex_rows_(self):
+        for i, entry in enumerate(self._entries_):
+            entry._data_._index_ = i
+
+    def _append_columns_(self, columns: list, count: int):
+        # Appends the given number of entries whose data is stored in columns ordered like the decoded fields
+        self._materialize_()
+        fields = self._data_fields_()
+
+        if self._columns_ is not None:
+            start = len(self._entries_)
+
+            # Convert all values first so that no column is changed if any value is invalid
+            chunks = [_make_column_(field.type, values) for field, values in zip(fields, columns)]
+
+            for field, chunk in zip(fields, chunks):
+                column = self._columns_.get(field.hash)
+
+                if column is None:
+                    self._columns_[field.hash] = chunk
+                elif isinstance(chunk, list) and isinstance(column, array.array):
+                    _widen_column_(self._columns_, field.hash).extend(chunk)
+                else:
+                    column.extend(chunk)
+
+            for i in range(start, start + count):
+                entry = JMapEntry(self)
+                entry._data_ = _JMapColumnRow(self._columns_, i)
+                self._entries_.append(entry)
+        else:
+            field_hashes = tuple(field.hash for field in fields)
+            rows = zip(*columns) if columns else [()] * count
+
+            for row in rows:
+                entry = JMapEntry(self)
+                entry._data_ = dict(zip(field_hashes, row))
+                self._entries_.append(entry)
+
+        self._invalidate_indexes_()
+
+    def copy(self):
+        """
+        Creates a copy of this container. The copy shares its data with this container until either of them gets
+        modified, so copying is cheap regardless of the number of entries. Modifying a container that shares its data
+        copies all of its entries' data first.
+
+        :return: the copy of this container.
+        """
+        self._materialize_(unshare=False)
+        clone = JMapInfo(self._hash_table_, self._columns_ is not None)
+        clone._entry_size_ = self._entry_size_
+        clone.manual_offsets = self.manual_offsets
+
+        for field_hash, field in self._fields_.items():
+            clone_field = JMapField(clone, field_hash, field.type, field.mask, field.shift, field._offset_,
+                                    field.default)
+            clone._fields_[field_hash] = clone_field
+
+        if self._projection_ is not None:
+            clone._projection_ = tuple(clone._fields_[field.hash] for field in self._projection_)
+
+        if self._share_ is None:
+            self._share_ = _JMapShare()
+
+        self._share_.count += 1
+        clone._share_ = self._share_
+
+        if self._columns_ is not None:
+            clone._columns_ = dict(self._columns_)
+            clone._entries_ = _JMapSharedEntries(clone, None, len(self._entries_))
+        else:
+            rows = [entry._data_ for entry in self._entries_]
+            clone._entries_ = _JMapSharedEntries(clone, rows, len(rows))
+
+        return clone
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def _unpack_fields_(self, data, off: int, is_big_endian: bool) -> tuple:
+        # Unpack header and calculate entries and string pool offsets
+        profiler = __PROFILER_STATE__.profiler
+        start = time.perf_counter() if profiler is not None else 0.0
+        strct = self.__STRUCT_BE__ if is_big_endian else self.__STRUCT_LE__
+        num_entries, num_fields, off_data, self._entry_size_ = strct.unpack_from(data, off)
+        off_entries = off + off_data
+        off_strings = off_entries + (num_entries * self._entry_size_)
+
+        # Unpack fields
+        off_tmp = off + 0x10
+
+        for i in range(num_fields):
+            field = JMapField(self)
+            field._unpack_(data, off_tmp, is_big_endian)
+            self._fields_[field.hash] = field
+            off_tmp += 0xC
+
+        if profiler is not None:
+            profiler.record("parse_fields", time.perf_counter() - start, fields=num_fields,
+                            pool_bytes=max(0, len(data) - off_strings))
+
+        return num_entries, off_entries, off_strings
+
+    def _get_codec_(self, fields: tuple, is_big_endian: bool):
+        # Retrieves the compiled row codec for the layout of the given fields
+        if not fields:
+            return None
+
+        layout = tuple((field._type_, field.mask, field.shift, field._offset_) for field in fields)
+        return _get_row_codec_(layout, self._entry_size_, is_big_endian)
+
+    def _unpack_(self, data, off: int, is_big_endian: bool, encoding: str, lazy: bool = False, fields=None):
+        num_entries, off_entries, off_strings = self._unpack_fields_(data, off, is_big_endian)
+
+        # Select the fields to be decoded
+        if fields is not None:
+            self._projection_ = tuple({self.get_field(field_key): None for field_key in fields})
+
+        # Unpack entries using the compiled row codec for this field layout
+        fields = self._data_fields_()
+        codec = self._get_codec_(fields, is_big_endian) if num_entries else None
+
+        if lazy:
+            self._entries_ = _JMapLazyEntries(self, data, off_entries, num_entries, codec, off_strings, encoding)
+            return
+
+        if codec is not None:
+            string_pool = _JMapStringPoolReader(data, off_strings, encoding)
+            columns = codec.unpack_columns(data, off_entries, num_entries, string_pool, encoding)
+        else:
+            columns = [() for _ in fields]
+
+        self._append_columns_(columns, num_entries)
+
+    def makebin(self, is_big_endian: bool, encoding: str) -> bytearray:
+        """
+        Packs the container's contents according to the BCSV format and returns the resulting bytearray buffer.
+
+        :param is_big_endian: the endianness of the data.
+        :param encoding: the encoding for strings.
+        :return: the packed bytearray buffer.
+        :raises JMapException: if only some fields were decoded.
+        """
+        if self._projection_ is not None:
+            raise JMapException("Cannot pack a container whose fields were only partially decoded!")
+
+        self._materialize_(unshare=False)
+
+        # Prepare output buffer and write header
+        num_entries = len(self._entries_)
+        off_data = self._prepare_layout_()
+        buffer = bytearray(off_data + num_entries * self._entry_size_)
+        self._pack_header_(buffer, num_entries, is_big_endian)
+
+        # Pack entries using the compiled row codec and prepare the string pool
+        fields = tuple(self._fields_.values())
+        string_pool = _JMapStringPoolBuilder(encoding)
+
+        if fields and num_entries:
+            codec = self._get_codec_(fields, is_big_endian)
+
+            if self._columns_ is not None:
+                columns = [self._columns_[field.hash] for field in fields]
+            else:
+                columns = [[entry._data_[field.hash] for entry in self._entries_] for field in fields]
+
+            codec.pack_columns(buffer, off_data, columns, string_pool, encoding)
+
+        buffer += string_pool.data()
+
+        # Align buffer to 32 bytes
+        len_buf = len(buffer)
+        buffer += bytearray([0x40] * ((len_buf + 31 & ~31) - len_buf))
+
+        return buffer
+
+    def _prepare_layout_(self) -> int:
+        # Calculates the entry size and field offsets and returns the offset to the entries
+        len_data_entry = 0
+
+        if self.manual_offsets:
+            for field in self._fields_.values():
+                potential_len = field.offset + field.type.size
+
+                if potential_len > len_data_entry:
+                    len_data_entry = potential_len
+        else:
+            for field in sorted(self._fields_.values(), key=lambda k: k.type.order):
+                field._offset_ = len_data_entry
+                len_data_entry += field.type.size
+
+        # Align total entry size to 4 bytes
+        self._entry_size_ = len_data_entry + 3 & ~3
+
+        return 0x10 + len(self._fields_) * 0xC
+
+    def _pack_header_(self, buffer, num_entries: int, is_big_endian: bool):
+        # Packs the header and fields, requires the layout to be prepared first
+        num_fields = len(self._fields_)
+        strct = self.__STRUCT_BE__ if is_big_endian else self.__STRUCT_LE__
+        strct.pack_into(buffer, 0, num_entries, num_fields, 0x10 + num_fields * 0xC, self._entry_size_)
+
+        # Pack fields
+        off_tmp = 0x10
+
+        for field in self._fields_.values():
+            field._pack_(buffer, off_tmp, is_big_endian)
+            off_tmp += 0xC
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Incremental JMap writer
+# ----------------------------------------------------------------------------------------------------------------------
+class JMapWriter:
+    """
+    Writes JMap / BCSV data incrementally to a binary file. The fields of a JMapInfo container are used as the fixed
+    schema, and entries are passed in one at a time or in batches. Entries are packed in small batches and streamed to
+    the file right away. Only the deduplicated string pool is kept in memory until it is appended when the writer gets
+    closed. The header is written first and its number of entries is updated upon closing, so the file object has to
+    be seekable. It is recommended to use the writer as a context manager:
+
+    with JMapWriter(schema, "Table.bcsv") as writer:
+        writer.write_row(("Name", 1, 2.0))
+    """
+
+    # Number of entries that are packed at once
+    __BATCH_SIZE__ = 256
+
+    def __init__(self, schema: JMapInfo, file, big_endian: bool = True, encoding: str = "shift_jisx0213"):
         """
-        Removes and unlinks all entries from this container.
+        Constructs a new writer and writes the header and fields of the schema to the given file. The schema's field
+        offsets and entry size are updated like they would be when packing the container.
+
+        :param schema: the JMapInfo container whose fields specify the schema.
+        :param file: the file path or a writable and seekable binary file object.
+        :param big_endian: the endianness of the data.
+        :param encoding: the encoding for strings.
         """
-        for entry in self._entries_:
-            entry._jmap_ = None
+        self._owns_file_ = isinstance(file, (str, os.PathLike))
+        self._file_ = open(file, "wb") if self._owns_file_ else file
+        self._big_endian_ = big_endian
+        self._encoding_ = encoding
+        self._schema_ = schema
+        self._fields_ = schema.fields
+        self._field_names_ = tuple(field.name for field in self._fields_)
+        self._batch_ = list()
+        self._string_pool_ = _JMapStringPoolBuilder(encoding)
+        self._num_entries_ = 0
+
+        # Write header and fields. The number of entries is updated when closing the writer.
+        self._off_data_ = schema._prepare_layout_()
+        self._entry_size_ = schema._entry_size_
+        self._codec_ = schema._get_codec_(self._fields_, big_endian)
+        self._start_ = self._file_.tell()
+
+        header = bytearray(self._off_data_)
+        schema._pack_header_(header, 0, big_endian)
+        self._write_(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        elif self._owns_file_:
+            self._file_.close()
 
-        self._entries_.clear()
+    def __len__(self):
+        return self._num_entries_ + len(self._batch_)
 
-    def sort_entries(self, key, reverse: bool = False):
+    def write_row(self, row):
         """
-        Sorts the entries using the given sorting key.
+        Adds a single entry. The row is either a sequence of values in the order of the schema's fields, or a mapping
+        from field names or hashes to values. Fields that are missing in a mapping are set to their default values.
 
-        :param key: the sorting key function.
-        :param reverse: reverse sorting order.
+        :param row: the sequence or mapping of values.
+        :raises JMapException: when the number of values does not match the number of fields.
         """
-        self._entries_.sort(key=key, reverse=reverse)
+        if isinstance(row, dict):
+            row = [
+                row[field.hash] if field.hash in row else row.get(field_name, field.default)
+                for field, field_name in zip(self._fields_, self._field_names_)
+            ]
+        elif len(row) != len(self._fields_):
+            raise JMapException(f"Expected {len(self._fields_)} values, found {len(row)} instead!")
 
-    def copy(self):
-        clone = JMapInfo(self._hash_table_)
-        clone._entry_size_ = self._entry_size_
+        self._batch_.append(row)
 
-        for field_hash, field in self._fields_.items():
-            clone_field = JMapField(clone, field_hash, field.type, field.mask, field.shift, field.default)
-            clone._fields_[field_hash] = clone_field
+        if len(self._batch_) >= self.__BATCH_SIZE__:
+            self.flush()
 
-        for entry in self._entries_:
-            clone_entry = JMapEntry(clone)
-            clone_entry._data_ = entry._data_.copy()
-            clone._entries_.append(clone_entry)
+    def write_rows(self, rows):
+        """
+        Adds all entries from the given iterable. See write_row for the supported row formats.
 
-        return clone
+        :param rows: the iterable of rows.
+        """
+        for row in rows:
+            self.write_row(row)
 
-    __copy__ = copy
-    __deepcopy__ = copy
+    def _write_columns_(self, columns: list, count: int):
+        # Packs entries whose values are given column-wise in the order of the schema's fields
+        self.flush()
+        buffer = bytearray(count * self._entry_size_)
 
-    def _unpack_(self, data, off: int, is_big_endian: bool, encoding: str):
-        # Unpack header and calculate string pool offset
-        strct = self.__STRUCT_BE__ if is_big_endian else self.__STRUCT_LE__
-        num_entries, num_fields, off_data, self._entry_size_ = strct.unpack_from(data, off)
-        off_strings = off + off_data + (num_entries * self._entry_size_)
+        if self._codec_ is not None:
+            self._codec_.pack_columns(buffer, 0, columns, self._string_pool_, self._encoding_)
 
-        # Unpack fields
-        off_tmp = off + 0x10
+        self._write_(buffer)
+        self._num_entries_ += count
 
-        for i in range(num_fields):
-            field = JMapField(self)
-            field._unpack_(data, off_tmp, is_big_endian)
-            self._fields_[field.hash] = field
-            off_tmp += 0xC
+    def _write_(self, data):
+        # Writes to the file and records the time spent if a profiler is active
+        profiler = __PROFILER_STATE__.profiler
 
-        # Unpack entries
-        off_tmp = off + off_data
+        if profiler is None:
+            self._file_.write(data)
+            return
 
-        strct_u16 = self.__U16_BE__ if is_big_endian else self.__U16_LE__
-        strct_u32 = self.__U32_BE__ if is_big_endian else self.__U32_LE__
-        strct_f32 = self.__F32_BE__ if is_big_endian else self.__F32_LE__
+        start = time.perf_counter()
+        self._file_.write(data)
+        profiler.record("write", time.perf_counter() - start, bytes=len(data))
 
-        for i in range(num_entries):
-            entry = JMapEntry(self)
+    def flush(self):
+        """Packs all pending entries and writes them to the file."""
+        if not self._batch_:
+            return
 
-            for field in self._fields_.values():
-                field_type = field.type
-                off_val = off_tmp + field._offset_
-                val = None
+        buffer = bytearray(len(self._batch_) * self._entry_size_)
 
-                # Read long
-                if field_type == JMapFieldType.LONG or field_type == JMapFieldType.UNSIGNED_LONG:
-                    val = (strct_u32.unpack_from(data, off_val)[0] & field.mask) >> field.shift
-                    val |= ~0xFFFFFFFF if val & 0x80000000 else 0
+        if self._codec_ is not None:
+            self._codec_.pack_columns(buffer, 0, list(zip(*self._batch_)), self._string_pool_, self._encoding_)
 
-                # Read string
-                elif field_type == JMapFieldType.STRING:
-                    # Read 32 bytes maximum
-                    end = data.index(0x00, off_val, off_val + 32)
-                    end = 32 if end < 0 else end
-                    val = data[off_val:end].decode(encoding)
+        self._write_(buffer)
+        self._num_entries_ += len(self._batch_)
+        self._batch_.clear()
+
+    def close(self):
+        """
+        Writes all pending entries, the string pool and the padding, and updates the header's number of entries. If
+        the writer opened the file itself, the file will be closed as well.
+        """
+        self.flush()
 
-                # Read float
-                elif field_type == JMapFieldType.FLOAT:
-                    val = strct_f32.unpack_from(data, off_val)[0]
+        # Append string pool and align the data to 32 bytes
+        string_pool = self._string_pool_.data()
+        self._write_(string_pool)
 
-                # Read short
-                elif field_type == JMapFieldType.SHORT:
-                    val = (strct_u16.unpack_from(data, off_val)[0] & field.mask) >> field.shift
-                    val |= ~0xFFFF if val & 0x8000 else 0
+        len_data = self._off_data_ + self._num_entries_ * self._entry_size_ + len(string_pool)
+        self._write_(bytes([0x40] * ((len_data + 31 & ~31) - len_data)))
 
-                # Read char
-                elif field_type == JMapFieldType.CHAR:
-                    val = (data[off_val] & field.mask) >> field.shift
-                    val |= ~0xFF if val & 0x80 else 0
+        # Update the header
+        off_end = self._file_.tell()
+        header = bytearray(self._off_data_)
+        self._schema_._pack_header_(header, self._num_entries_, self._big_endian_)
+        self._file_.seek(self._start_)
+        self._file_.write(header)
+        self._file_.seek(off_end)
+        self._file_.flush()
 
-                # Read string at offset
-                elif field_type == JMapFieldType.STRING_OFFSET:
-                    off_val = off_strings + strct_u32.unpack_from(data, off_val)[0]
-                    end_str = off_val
+        if self._owns_file_:
+            self._file_.close()
 
-                    while data[end_str]:
-                        end_str += 1
 
-                    val = data[off_val:end_str].decode(encoding)
+# ----------------------------------------------------------------------------------------------------------------------
+# In-place patching
+# ----------------------------------------------------------------------------------------------------------------------
+class JMapPatcher:
+    """
+    Edits single cells of packed JMap / BCSV data in place without unpacking and repacking the whole table. The header
+    and fields are parsed once, and every read or write only touches the bytes of the affected cell. Bit-packed fields
+    are merged into their storage word, so other fields sharing that word are preserved. The buffer has to be writable,
+    for example a bytearray or a writable mmap:
 
-                entry._data_[field.hash] = val
+    patcher = JMapPatcher(hashtable, buffer)
+    patcher[3, "PowerStarNum"] = 12
 
-            self._entries_.append(entry)
-            off_tmp += self._entry_size_
+    New strings for STRING_OFFSET fields are appended at the tail of the string pool, unless the pool already contains
+    the string. They are written into the alignment padding if they fit, otherwise the buffer has to be a bytearray that
+    ends with the table so that it can be resized.
+    """
 
-    def makebin(self, is_big_endian: bool, encoding: str) -> bytearray:
+    def __init__(self, hashtable: JMapHashTable, buffer, offset: int = 0, big_endian: bool = True,
+                 encoding: str = "shift_jisx0213", size: int = None):
         """
-        Packs the container's contents according to the BCSV format and returns the resulting bytearray buffer.
+        Constructs a new patcher for the table at the given offset of the writable buffer.
 
-        :param is_big_endian: the endianness of the data.
+        :param hashtable: the hash lookup table to be used.
+        :param buffer: the writable byte buffer.
+        :param offset: the offset of the table into the buffer.
+        :param big_endian: the endianness of the data.
         :param encoding: the encoding for strings.
-        :return: the packed bytearray buffer.
+        :param size: the size of the table. If None, the table extends to the end of the buffer.
         """
-        # Prepare header information
-        num_entries = len(self._entries_)
-        num_fields = len(self._fields_)
-        off_data = 0x10 + num_fields * 0xC
+        self._buffer_ = buffer
+        self._offset_ = offset
+        self._encoding_ = encoding
+        self._jmap_ = JMapInfo(hashtable)
+        self._num_entries_, self._off_entries_, self._off_strings_ = self._jmap_._unpack_fields_(buffer, offset,
+                                                                                               big_endian)
+        self._entry_size_ = self._jmap_._entry_size_
+        self._end_ = len(buffer) if size is None else offset + size
+        self._strings_ = None  # Maps strings to their offsets in the string pool, collected on first use
+        self._pool_end_ = None  # End of the string pool, excluding the alignment padding
+
+        # Compile the storage access for every field
+        endian = ">" if big_endian else "<"
+        self._cells_ = dict()
+
+        for field in self._jmap_._fields_.values():
+            field_type = field.type
+            strct = struct.Struct(endian + _JMapRowCodec.__CODES__[field_type][0])
+
+            if field._offset_ + strct.size > self._entry_size_:
+                raise JMapException(f"Field data exceeds entry size of 0x{self._entry_size_:X} bytes!")
+
+            mask = field.mask & field_type.mask
+            sign = 1 << (field_type.size * 8 - 1)
+            sign = sign if (mask >> field.shift) & sign else 0
+            self._cells_[field.hash] = (field, strct, mask, sign)
 
-        # Calculate entry size and field offsets
-        len_data_entry = 0
+    @property
+    def fields(self) -> tuple:
+        """The fields of the table."""
+        return self._jmap_.fields
 
-        if self.manual_offsets:
-            for field in self._fields_.values():
-                potential_len = field.offset + field.type.size
+    def __len__(self):
+        return self._num_entries_
 
-                if potential_len > len_data_entry:
-                    len_data_entry = potential_len
+    def _locate_(self, index: int, field_key) -> tuple:
+        if not isinstance(index, int):
+            raise TypeError("Index must be an int!")
+        if index < 0:
+            index += self._num_entries_
+        if index < 0 or index >= self._num_entries_:
+            raise IndexError("Entry index out of range!")
+
+        field, strct, mask, sign = self._cells_[self._jmap_.get_field(field_key).hash]
+        return field, strct, mask, sign, self._off_entries_ + index * self._entry_size_ + field._offset_
+
+    def get(self, index: int, field_key):
+        """
+        Reads the value of a single cell.
+
+        :param index: the entry's index.
+        :param field_key: the field's key (hash or name).
+        :return: the cell's value.
+        """
+        field, strct, mask, sign, off = self._locate_(index, field_key)
+        field_type = field.type
+        val = strct.unpack_from(self._buffer_, off)[0]
+
+        if field_type is JMapFieldType.FLOAT:
+            return val
+        elif field_type is JMapFieldType.STRING:
+            return val.split(b"\0", 1)[0].decode(self._encoding_)
+        elif field_type is JMapFieldType.STRING_OFFSET:
+            off_string = self._off_strings_ + val
+            end = self._buffer_.find(b"\0", off_string)
+            return self._buffer_[off_string:end if end >= 0 else len(self._buffer_)].decode(self._encoding_)
+
+        val = (val & mask) >> field.shift
+        return val - (sign << 1) if val & sign else val
+
+    def set(self, index: int, field_key, value):
+        """
+        Writes the value of a single cell. Only the bytes of the cell are modified.
+
+        :param index: the entry's index.
+        :param field_key: the field's key (hash or name).
+        :param value: the new value.
+        :raises TypeError: if the value's type does not match the field's data type.
+        :raises JMapException: if a new string does not fit into the buffer.
+        """
+        field, strct, mask, sign, off = self._locate_(index, field_key)
+        field_type = field.type
+
+        if type(value) is not field_type.data_type:
+            raise TypeError(f"Wrong data type for field [{field.hash:08X}]: Expected {field_type.data_type}, found {type(value)} instead.")
+
+        if field_type is JMapFieldType.STRING:
+            value = value.encode(self._encoding_)
+
+            if len(value) >= 32:
+                warnings.warn("String is too long to be embedded. String will be chopped to fit 32 bytes!")
+        elif field_type is JMapFieldType.STRING_OFFSET:
+            value = self._add_string_(value)
+        elif field_type is not JMapFieldType.FLOAT:
+            value = (strct.unpack_from(self._buffer_, off)[0] & ~mask) | ((value << field.shift) & mask)
+
+        strct.pack_into(self._buffer_, off, value)
+
+    def __getitem__(self, key: tuple):
+        return self.get(*key)
+
+    def __setitem__(self, key: tuple, value):
+        self.set(*key, value)
+
+    def _add_string_(self, string: str) -> int:
+        # Returns the offset of the string in the pool, appending it at the tail if it does not exist yet
+        buffer = self._buffer_
+
+        if self._strings_ is None:
+            # The pool ends with the last terminator, followed by the alignment padding
+            pool_end = self._end_
+
+            while pool_end > self._off_strings_ and buffer[pool_end - 1] == 0x40:
+                pool_end -= 1
+
+            self._strings_ = dict()
+            self._pool_end_ = pool_end
+            off_string = self._off_strings_
+
+            for enc_string in bytes(buffer[off_string:pool_end]).split(b"\0")[:-1]:
+                self._strings_.setdefault(enc_string, off_string - self._off_strings_)
+                off_string += len(enc_string) + 1
+
+        enc_string = string.encode(self._encoding_)
+        off_string = self._strings_.get(enc_string)
+
+        if off_string is not None:
+            return off_string
+
+        data = enc_string + b"\0"
+        pool_end = self._pool_end_
+        new_end = pool_end + len(data)
+
+        if new_end > self._end_:
+            if not isinstance(buffer, bytearray) or self._end_ != len(buffer):
+                raise JMapException("Not enough space to append the string to the string pool!")
+
+            # Align the table to 32 bytes again
+            aligned_end = new_end + (-(new_end - self._offset_) % 32)
+            buffer[pool_end:] = data + bytes([0x40] * (aligned_end - new_end))
+            self._end_ = len(buffer)
         else:
-            for field in sorted(self._fields_.values(), key=lambda k: k.type.order):
-                field._offset_ = len_data_entry
-                len_data_entry += field.type.size
+            buffer[pool_end:new_end] = data
 
-        # Align total entry size to 4 bytes
-        self._entry_size_ = len_data_entry + 3 & ~3
+        self._pool_end_ = new_end
+        off_string = pool_end - self._off_strings_
+        self._strings_[enc_string] = off_string
+        return off_string
 
-        # Prepare output buffer and write header
-        buffer = bytearray(off_data + num_entries * self._entry_size_)
-        strct = self.__STRUCT_BE__ if is_big_endian else self.__STRUCT_LE__
-        strct.pack_into(buffer, 0, num_entries, num_fields, off_data, self._entry_size_)
 
-        # Pack fields
-        off_tmp = 0x10
+# ----------------------------------------------------------------------------------------------------------------------
+# Parse cache
+# ----------------------------------------------------------------------------------------------------------------------
+def _decode_contents_(data, big_endian: bool, encoding: str) -> tuple:
+    # Decodes the data into a tuple of plain objects: entry size, field infos, number of entries and columns. These can
+    # be stored or sent to another process and turned into a container using _restore_fields_.
+    jmap = JMapInfo(None)  # Field names are not needed for decoding
+    num_entries, off_entries, off_strings = jmap._unpack_fields_(data, 0, big_endian)
+    fields = tuple(jmap._fields_.values())
+    field_infos = tuple((field.hash, field.mask, field._offset_, field.shift, field.type.value) for field in fields)
+    codec = jmap._get_codec_(fields, big_endian) if num_entries else None
 
-        for field in self._fields_.values():
-            field._pack_(buffer, off_tmp, is_big_endian)
-            off_tmp += 0xC
+    if codec is not None:
+        string_pool = _JMapStringPoolReader(data, off_strings, encoding)
+        columns = codec.unpack_columns(data, off_entries, num_entries, string_pool, encoding)
+        columns = [list(values) for values in columns]
+    else:
+        columns = [[] for _ in fields]
 
-        # Pack entries and prepare the string pool
-        off_strings = len(buffer)
-        string_offsets = dict()
+    return jmap._entry_size_, field_infos, num_entries, columns
 
-        strct_u16 = self.__U16_BE__ if is_big_endian else self.__U16_LE__
-        strct_u32 = self.__U32_BE__ if is_big_endian else self.__U32_LE__
-        strct_f32 = self.__F32_BE__ if is_big_endian else self.__F32_LE__
 
-        for entry in self._entries_:
-            for field in self._fields_.values():
-                field_type = field.type
-                off_val = off_tmp + field._offset_
-                val = entry._data_[field.hash]
-
-                # Pack long
-                if field_type == JMapFieldType.LONG or field_type == JMapFieldType.UNSIGNED_LONG:
-                    prev = strct_u32.unpack_from(buffer, off_val)[0] & ~field.mask
-                    val = ((val << field.shift) & field.mask) | prev
-                    strct_u32.pack_into(buffer, off_val, val)
-
-                # Pack string
-                elif field_type == JMapFieldType.STRING:
-                    enc_string = val.encode(encoding)
-                    if len(enc_string) >= 32:
-                        warnings.warn("String is too long to be embedded. String will be chopped to fit 32 bytes!")
-                    len_string = min(len(enc_string), 32)
-                    buffer[off_val:off_val + len_string] = enc_string[:len_string]
-
-                # Pack float
-                elif field_type == JMapFieldType.FLOAT:
-                    strct_f32.pack_into(buffer, off_val, val)
-
-                # Pack short
-                elif field_type == JMapFieldType.SHORT:
-                    prev = strct_u16.unpack_from(buffer, off_val)[0] & ~field.mask
-                    val = ((val << field.shift) & field.mask) | prev
-                    strct_u16.pack_into(buffer, off_val, val)
-
-                # Pack char
-                elif field_type == JMapFieldType.CHAR:
-                    buffer[off_val] = (val << field.shift) & field.mask
-
-                # Pack string at offset
-                elif field_type == JMapFieldType.STRING_OFFSET:
-                    if val in string_offsets:
-                        off_string = string_offsets[val]
-                    else:
-                        off_string = len(buffer) - off_strings
-                        string_offsets[val] = off_string
+def _restore_fields_(jmap: JMapInfo, contents: tuple, fields=None) -> list:
+    # Restores the fields of the decoded contents in the empty container and returns the columns to be appended
+    entry_size, field_infos, num_entries, columns = contents
+    jmap._entry_size_ = entry_size
 
-                        # shift_jis appears to truncate the zero terminator sometimes...
-                        buffer += val.encode(encoding)
-                        buffer += "\0".encode(encoding)
+    for field_hash, mask, offset, shift, raw_type in field_infos:
+        field_type = JMapFieldType(raw_type)
+        jmap._fields_[field_hash] = JMapField(jmap, field_hash, field_type, mask, shift, offset, field_type.default)
 
-                    strct_u32.pack_into(buffer, off_val, off_string)
+    if fields is not None:
+        jmap._projection_ = tuple({jmap.get_field(field_key): None for field_key in fields})
+        columns_by_hash = dict(zip((field_info[0] for field_info in field_infos), columns))
+        columns = [columns_by_hash[field.hash] for field in jmap._projection_]
 
-            off_tmp += self._entry_size_
+    return columns
 
-        # Align buffer to 32 bytes
-        len_buf = len(buffer)
-        buffer += bytearray([0x40] * ((len_buf + 31 & ~31) - len_buf))
 
-        return buffer
+class JMapParseCache:
+    """
+    A content-addressed on-disk cache for decoded tables. Entries are keyed by a hash of the file's contents, the
+    endianness and the encoding, so they become invalid automatically as soon as a file changes. The decoded fields and
+    columns are stored using marshal, which loads much faster than decoding the packed data. The total size of the
+    cache is bounded; the least recently used entries are evicted first.
+    """
+
+    __MAGIC__ = "PJTC"
+    __VERSION__ = 1
+    __SUFFIX__ = ".bin"
+
+    def __init__(self, cache_dir: str = None, max_size: int = 256 << 20):
+        """
+        Constructs a new parse cache that stores its entries in the given directory. If no directory is specified, the
+        "tables" folder inside pyjmap's cache directory is used.
+
+        :param cache_dir: the directory to store cache entries in.
+        :param max_size: the maximum total size of all entries in bytes.
+        """
+        self._cache_dir_ = cache_dir if cache_dir else os.path.join(_get_cache_dir_(), "tables")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_dir(self) -> str:
+        """The directory that stores the cache entries."""
+        return self._cache_dir_
+
+    def _get_key_(self, data, big_endian: bool, encoding: str) -> str:
+        # Field names are not part of the decoded contents, so the hash function does not need to be part of the key
+        digest = hashlib.blake2b(data, digest_size=20)
+        digest.update(f"|{int(big_endian)}|{encoding}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _get_path_(self, key: str) -> str:
+        return os.path.join(self._cache_dir_, key + self.__SUFFIX__)
+
+    def load(self, jmap: JMapInfo, data, big_endian: bool, encoding: str, fields=None):
+        """
+        Unpacks the given data into the empty JMapInfo container. The decoded contents are taken from the cache if
+        possible, otherwise the data gets decoded and stored in the cache.
+
+        :param jmap: the empty JMapInfo container.
+        :param data: the byte buffer containing the JMap / BCSV data.
+        :param big_endian: the endianness of the data.
+        :param encoding: the encoding for strings.
+        :param fields: the keys (names or hashes) of the fields to be decoded.
+        """
+        path = self._get_path_(self._get_key_(data, big_endian, encoding))
+        contents = self._read_entry_(path)
+
+        if contents is None:
+            self.misses += 1
+            contents = _decode_contents_(data, big_endian, encoding)
+            self._write_entry_(path, contents)
+        else:
+            self.hits += 1
+
+        jmap._append_columns_(_restore_fields_(jmap, contents, fields), contents[2])
+
+    def _read_entry_(self, path: str):
+        profiler = __PROFILER_STATE__.profiler
+        start = time.perf_counter() if profiler is not None else 0.0
+
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+
+            magic, version, *contents = marshal.loads(raw)
+
+            if magic != self.__MAGIC__ or version != self.__VERSION__ or len(contents) != 4:
+                return None
+
+            # Mark the entry as recently used
+            os.utime(path)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if profiler is not None:
+            profiler.record("cache_load", time.perf_counter() - start, bytes=len(raw), rows=contents[2])
+
+        return tuple(contents)
+
+    def _write_entry_(self, path: str, contents: tuple):
+        raw = marshal.dumps((self.__MAGIC__, self.__VERSION__, *contents))
+
+        try:
+            os.makedirs(self._cache_dir_, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+
+            with open(tmp_path, "wb") as f:
+                f.write(raw)
+
+            os.replace(tmp_path, path)
+            self._evict_()
+        except OSError:
+            pass
+
+    def _evict_(self):
+        # Removes the least recently used entries until the cache fits its maximum size
+        entries = list()
+        total_size = 0
+
+        for dir_entry in os.scandir(self._cache_dir_):
+            if dir_entry.name.endswith(self.__SUFFIX__):
+                stat = dir_entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, dir_entry.path))
+                total_size += stat.st_size
+
+        entries.sort()
+
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+                total_size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+        """
+        if not os.path.isdir(self._cache_dir_):
+            return
+
+        for dir_entry in os.scandir(self._cache_dir_):
+            if dir_entry.name.endswith(self.__SUFFIX__):
+                try:
+                    os.remove(dir_entry.path)
+                except OSError:
+                    pass
+
+
+__DEFAULT_PARSE_CACHE__ = None  # Shared cache that is created on first use, see from_file
 
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Helper I/O functions
 # ----------------------------------------------------------------------------------------------------------------------
-def from_buffer(hashtable: JMapHashTable, buffer, offset: int, big_endian: bool = True, encoding: str = "shift_jisx0213") -> JMapInfo:
+def from_buffer(hashtable: JMapHashTable, buffer, offset: int, big_endian: bool = True, encoding: str = "shift_jisx0213",
+                columnar: bool = False, fields=None) -> JMapInfo:
     """
     Creates and returns a new JMapInfo container by unpacking the content from the specified buffer. The data is
-    expected to be stored in the JMap / BCSV format.
+    expected to be stored in the JMap / BCSV format. If fields (names or hashes) are specified, only their data will be
+    decoded. All fields remain accessible, but the resulting container cannot be packed.
 
     :param hashtable: the hash lookup table to be used.
     :param buffer: the byte buffer.
     :param offset: the offset into the buffer.
     :param big_endian: the endianness of the data.
     :param encoding: the encoding for strings.
+    :param columnar: whether the container should store its data column-wise.
+    :param fields: the keys (names or hashes) of the fields to be decoded.
     :return: the unpacked JMapInfo container.
     """
-    jmap = JMapInfo(hashtable)
-    jmap._unpack_(buffer, offset, big_endian, encoding)
+    jmap = JMapInfo(hashtable, columnar)
+    jmap._unpack_(buffer, offset, big_endian, encoding, fields=fields)
     return jmap
 
 
+def from_buffers(hashtable: JMapHashTable, buffer, offsets, big_endian: bool = True,
+                 encoding: str = "shift_jisx0213", columnar: bool = False, fields=None) -> list:
+    """
+    Creates and returns a list of JMapInfo containers by unpacking the tables at the given offsets from one buffer, for
+    example an archive that holds multiple tables. If the buffer is Yaz0-compressed, it is decompressed once before the
+    tables are unpacked, and the offsets are expected to point into the decompressed data. The tables are unpacked from
+    the buffer directly without copying any slices.
+
+    :param hashtable: the hash lookup table to be used.
+    :param buffer: the byte buffer, optionally Yaz0-compressed.
+    :param offsets: the offsets of the tables.
+    :param big_endian: the endianness of the data.
+    :param encoding: the encoding for strings.
+    :param columnar: whether the containers should store their data column-wise.
+    :param fields: the keys (names or hashes) of the fields to be decoded.
+    :return: the list of unpacked JMapInfo containers.
+    """
+    if yaz0.is_compressed(buffer):
+        buffer = yaz0.decompress(buffer)
+    elif not isinstance(buffer, (bytes, bytearray)):
+        buffer = bytes(buffer)
+
+    return [from_buffer(hashtable, buffer, offset, big_endian, encoding, columnar, fields) for offset in offsets]
+
+
 def pack_buffer(jmap: JMapInfo, big_endian: bool = True, encoding: str = "shift_jisx0213") -> bytearray:
     """
     Packs the given JMapInfo's contents according to the BCSV format and returns the resulting bytearray buffer.
@@ -849,23 +2851,108 @@ def pack_buffer(jmap: JMapInfo, big_endian: bool = True, encoding: str = "shift_
     return jmap.makebin(big_endian, encoding)
 
 
-def from_file(hashtable: JMapHashTable, file_path: str, big_endian: bool = True, encoding: str = "shift_jisx0213") -> JMapInfo:
+def from_file(hashtable: JMapHashTable, file_path: str, big_endian: bool = True, encoding: str = "shift_jisx0213",
+              columnar: bool = False, lazy: bool = False, fields=None, cache=None) -> JMapInfo:
     """
     Creates and returns a new JMapInfo container by unpacking the contents from the given file path. The data is
-    expected to be stored in the JMap / BCSV format.
+    expected to be stored in the JMap / BCSV format. If lazy is True, the file is memory-mapped and only the header and
+    fields are parsed. Entries are then decoded on access, and the file is fully decoded and unmapped as soon as the
+    container gets modified. If fields (names or hashes) are specified, only their data will be decoded. All fields
+    remain accessible, but the resulting container cannot be packed. If a JMapParseCache is specified, the decoded
+    contents are loaded from and stored in that cache; True selects a cache in the default cache directory. The cache
+    is not used for lazy loading.
 
     :param hashtable: the hash lookup table to be used.
     :param file_path: the file path to the JMap / BCSV file.
     :param big_endian: the endianness of the data.
     :param encoding: the encoding for strings.
+    :param columnar: whether the container should store its data column-wise.
+    :param lazy: whether entries should be decoded on access from the memory-mapped file.
+    :param fields: the keys (names or hashes) of the fields to be decoded.
+    :param cache: the parse cache to be used, or True to use the default cache.
     :return: the unpacked JMapInfo container.
     """
-    jmap = JMapInfo(hashtable)
+    global __DEFAULT_PARSE_CACHE__
+
+    if cache is True:
+        if __DEFAULT_PARSE_CACHE__ is None:
+            __DEFAULT_PARSE_CACHE__ = JMapParseCache()
+
+        cache = __DEFAULT_PARSE_CACHE__
+
+    jmap = JMapInfo(hashtable, columnar)
     with open(file_path, "rb") as f:
-        jmap._unpack_(f.read(), 0, big_endian, encoding)
+        if lazy:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            try:
+                jmap._unpack_(data, 0, big_endian, encoding, lazy=True, fields=fields)
+            except Exception:
+                data.close()
+                raise
+        else:
+            profiler = __PROFILER_STATE__.profiler
+            start = time.perf_counter() if profiler is not None else 0.0
+            data = f.read()
+
+            if profiler is not None:
+                profiler.record("read", time.perf_counter() - start, bytes=len(data))
+
+            if cache:
+                cache.load(jmap, data, big_endian, encoding, fields)
+            else:
+                jmap._unpack_(data, 0, big_endian, encoding, fields=fields)
     return jmap
 
 
+def iter_entries(hashtable: JMapHashTable, source, big_endian: bool = True, encoding: str = "shift_jisx0213",
+                 fields=None, offset: int = 0):
+    """
+    Iterates over the entries of JMap / BCSV data without creating a JMapInfo container. The source may be a file path,
+    in which case the file is memory-mapped, or a byte buffer. Entries are decoded in small chunks and yielded as named
+    tuples, so memory usage stays constant regardless of the number of entries. Field names that are not valid
+    identifiers, such as unknown hashes, are replaced by their position, for example "_0". Only the specified fields
+    (names or hashes) are decoded, in the given order. All fields will be decoded if no fields are specified.
+
+    :param hashtable: the hash lookup table to be used.
+    :param source: the file path to the JMap / BCSV file or the byte buffer.
+    :param big_endian: the endianness of the data.
+    :param encoding: the encoding for strings.
+    :param fields: the keys (names or hashes) of the fields to be decoded.
+    :param offset: the offset into the buffer.
+    :return: a generator that yields a named tuple for every entry.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        data = source
+
+    try:
+        jmap = JMapInfo(hashtable)
+        num_entries, off_entries, off_strings = jmap._unpack_fields_(data, offset, big_endian)
+
+        selected = jmap.fields if fields is None else tuple(jmap.get_field(field_key) for field_key in fields)
+        row_type = collections.namedtuple("JMapRow", [field.name for field in selected], rename=True)
+        codec = jmap._get_codec_(selected, big_endian)
+        string_pool = _JMapStringPoolReader(data, off_strings, encoding)
+
+        for start in range(0, num_entries, __DECODE_CHUNK_SIZE__):
+            count = min(__DECODE_CHUNK_SIZE__, num_entries - start)
+
+            if codec is not None:
+                off_chunk = off_entries + start * jmap._entry_size_
+                rows = zip(*codec.unpack_columns(data, off_chunk, count, string_pool, encoding))
+            else:
+                rows = [()] * count
+
+            for row in rows:
+                yield row_type._make(row)
+    finally:
+        if data is not source:
+            data.close()
+
+
 def write_file(jmap: JMapInfo, file_path: str, big_endian: bool = True, encoding: str = "shift_jisx0213"):
     """
     Packs the given JMapInfo's contents according to the BCSV format and writes the resulting buffer's contents to the
@@ -877,18 +2964,128 @@ def write_file(jmap: JMapInfo, file_path: str, big_endian: bool = True, encoding
     :param encoding: the encoding for strings.
     """
     buffer = jmap.makebin(big_endian, encoding)
+    profiler = __PROFILER_STATE__.profiler
+    start = time.perf_counter() if profiler is not None else 0.0
 
     with open(file_path, "wb") as f:
         f.write(buffer)
         f.flush()
 
+    if profiler is not None:
+        profiler.record("write", time.perf_counter() - start, bytes=len(buffer))
+
 
 __CSV_FIELD_TYPES__ = ["Int", "EmbeddedString", "Float", "UnsignedInt", "Short", "Char", "String"]
 __CSV_FIELD_DEFAULTS__ = ["0", "0", "0.0", "0", "0", "0", "0"]
 __CSV_FIELD_PRIMARIES__ = [int, str, float, int, int, int, str]
 
 
-def from_csv(hashtable: JMapHashTable, file_path: str, encoding: str = "utf-8") -> JMapInfo:
+__CSV_CHUNK_SIZE__ = 4096  # Number of CSV rows that are converted at once
+
+
+def _read_csv_fields_(hashtable: JMapHashTable, jmap: JMapInfo, csvreader):
+    # Creates the fields described by the CSV header in the given container
+    field_descs = next(csvreader, None)
+
+    if field_descs is None:
+        raise SyntaxError("CSV file is empty.")
+
+    for field_desc in field_descs:
+        # Get field descriptor information
+        field_desc = field_desc.split(":")
+
+        if len(field_desc) != 3:
+            raise SyntaxError("Number of field descriptor details is not 3!")
+
+        field_name, field_type, field_default = field_desc
+
+        if len(field_name) == 0:
+            raise SyntaxError("Field name cannot be empty!")
+
+        # Get proper JMapFieldType and default value from descriptor
+        if field_type == "Int":
+            actual_type = JMapFieldType.LONG
+            actual_default = int(field_default)
+        elif field_type == "EmbeddedString":
+            actual_type = JMapFieldType.STRING
+            actual_default = ""
+        elif field_type == "Float":
+            actual_type = JMapFieldType.FLOAT
+            actual_default = float(field_default)
+        elif field_type == "UnsignedInt":
+            actual_type = JMapFieldType.UNSIGNED_LONG
+            actual_default = int(field_default)
+        elif field_type == "Short":
+            actual_type = JMapFieldType.SHORT
+            actual_default = int(field_default)
+        elif field_type == "Char":
+            actual_type = JMapFieldType.CHAR
+            actual_default = int(field_default)
+        elif field_type == "String":
+            actual_type = JMapFieldType.STRING_OFFSET
+            actual_default = ""
+        else:
+            raise SyntaxError(f"Unknown CSV field type {field_type} for field {field_name}")
+
+        # Check if field name is a hash
+        if field_name[0] == "[" and field_name[-1] == "]":
+            field_hash = int(field_name[1:-1], 16)
+        else:
+            field_hash = hashtable.add(field_name)
+
+        field = JMapField(jmap, field_hash, actual_type, actual_type.mask, 0, defval=actual_default)
+        jmap._fields_[field.hash] = field
+
+
+def _iter_csv_columns_(csvreader, fields: tuple, file):
+    """
+    Reads the CSV rows in chunks and yields every chunk as a list of columns with converted values, in the order of the
+    given fields. The converter and default value are resolved once per column. Empty cells are replaced with the
+    field's default value.
+    """
+    profiler = __PROFILER_STATE__.profiler
+    converters = [(__CSV_FIELD_PRIMARIES__[field.type.value], field.default) for field in fields]
+    num_fields = len(fields)
+    num_rows = 0
+    elapsed = 0.0
+
+    while True:
+        start = time.perf_counter() if profiler is not None else 0.0
+        chunk = list(itertools.islice(csvreader, __CSV_CHUNK_SIZE__))
+
+        # Only an empty chunk marks the end of the input, chunks may consist of blank lines only
+        if not chunk:
+            break
+
+        rows = [row for row in chunk if row]
+
+        if not rows:
+            continue
+
+        for row in rows:
+            if len(row) < num_fields:
+                raise SyntaxError(f"Expected {num_fields} cells in line {csvreader.line_num}, found {len(row)}!")
+
+        columns = list()
+
+        for (convert, default), cells in zip(converters, zip(*rows)):
+            if convert is str:
+                columns.append([cell if cell else default for cell in cells])
+            else:
+                columns.append([convert(cell) if cell else default for cell in cells])
+
+        num_rows += len(rows)
+
+        if profiler is not None:
+            elapsed += time.perf_counter() - start
+
+        yield columns, len(rows)
+
+    if profiler is not None:
+        profiler.record("parse_csv", elapsed, rows=num_rows, bytes=os.fstat(file.fileno()).st_size)
+
+
+def from_csv(hashtable: JMapHashTable, file_path: str, encoding: str = "utf-8", columnar: bool = False) -> JMapInfo:
     """
     Creates a new JMapInfo container using the raw CSV data found in the specified file. The CSV files have to be comma-
     delimited and may use quote marks for quotes strings. The information of each field consists of three components
@@ -898,100 +3095,215 @@ def from_csv(hashtable: JMapHashTable, file_path: str, encoding: str = "utf-8")
     :param hashtable: the hash lookup table to be used.
     :param file_path: the file path to the CSV file.
     :param encoding: the CSV file's encoding, expects utf-8 by default.
+    :param columnar: whether the container should store its data column-wise.
     :return: the created JMapInfo container.
     """
-    jmap = JMapInfo(hashtable)
+    jmap = JMapInfo(hashtable, columnar)
 
     with open(file_path, "r", encoding=encoding, newline="") as f:
         csvreader = csv.reader(f, delimiter=",", quotechar='"')
+        _read_csv_fields_(hashtable, jmap, csvreader)
 
-        # Create fields
-        field_descs = next(csvreader, None)
-
-        if field_descs is None:
-            raise SyntaxError("CSV file is empty.")
-
-        for field_desc in field_descs:
-            # Get field descriptor information
-            field_desc = field_desc.split(":")
-
-            if len(field_desc) != 3:
-                raise SyntaxError("Number of field descriptor details is not 3!")
-
-            field_name, field_type, field_default = field_desc
-
-            if len(field_name) == 0:
-                raise SyntaxError("Field name cannot be empty!")
-
-            # Get proper JMapFieldType and default value from descriptor
-            if field_type == "Int":
-                actual_type = JMapFieldType.LONG
-                actual_default = int(field_default)
-            elif field_type == "EmbeddedString":
-                actual_type = JMapFieldType.STRING
-                actual_default = ""
-            elif field_type == "Float":
-                actual_type = JMapFieldType.FLOAT
-                actual_default = float(field_default)
-            elif field_type == "UnsignedInt":
-                actual_type = JMapFieldType.UNSIGNED_LONG
-                actual_default = int(field_default)
-            elif field_type == "Short":
-                actual_type = JMapFieldType.SHORT
-                actual_default = int(field_default)
-            elif field_type == "Char":
-                actual_type = JMapFieldType.CHAR
-                actual_default = int(field_default)
-            elif field_type == "String":
-                actual_type = JMapFieldType.STRING_OFFSET
-                actual_default = ""
-            else:
-                raise SyntaxError(f"Unknown CSV field type {field_type} for field {field_name}")
-
-            # Check if field name is a hash
-            if field_name[0] == "[" and field_name[-1] == "]":
-                field_hash = int(field_name[1:-1], 16)
-            else:
-                field_hash = hashtable.add(field_name)
+        # Create entries
+        fields = tuple(jmap._fields_.values())
+        columns = [[] for _ in fields]
+        num_rows = 0
 
-            field = JMapField(jmap, field_hash, actual_type, actual_type.mask, 0, actual_default)
-            jmap._fields_[field.hash] = field
+        for chunk, count in _iter_csv_columns_(csvreader, fields, f):
+            for column, values in zip(columns, chunk):
+                column.extend(values)
 
-        # Create entries
-        for entry_row in csvreader:
-            entry = JMapEntry(jmap)
-            jmap._entries_.append(entry)
+            num_rows += count
 
-            for i, field in enumerate(jmap._fields_.values()):
-                if len(entry_row[i]) == 0:
-                    entry._data_[field.hash] = field.default
-                else:
-                    entry._data_[field.hash] = __CSV_FIELD_PRIMARIES__[field.type.value](entry_row[i])
+        jmap._append_columns_(columns, num_rows)
 
     return jmap
 
 
+def convert_csv(hashtable: JMapHashTable, csv_file_path: str, file_path: str, big_endian: bool = True,
+                encoding: str = "shift_jisx0213", csv_encoding: str = "utf-8") -> int:
+    """
+    Converts the specified CSV file to a JMap / BCSV file without creating a JMapInfo container. The CSV rows are read
+    and converted in chunks that are streamed to the entry encoder right away, so memory usage stays flat regardless of
+    the number of rows. The result is the same as packing the container returned by from_csv. See from_csv for the
+    expected CSV format.
+
+    :param hashtable: the hash lookup table to be used.
+    :param csv_file_path: the file path to the CSV file.
+    :param file_path: the file path to write the JMap / BCSV data to.
+    :param big_endian: the endianness of the data.
+    :param encoding: the encoding for strings.
+    :param csv_encoding: the CSV file's encoding, expects utf-8 by default.
+    :return: the number of converted rows.
+    """
+    schema = JMapInfo(hashtable)
+
+    with open(csv_file_path, "r", encoding=csv_encoding, newline="") as f:
+        csvreader = csv.reader(f, delimiter=",", quotechar='"')
+        _read_csv_fields_(hashtable, schema, csvreader)
+
+        with JMapWriter(schema, file_path, big_endian, encoding) as writer:
+            for columns, count in _iter_csv_columns_(csvreader, schema.fields, f):
+                writer._write_columns_(columns, count)
+
+            return len(writer)
+
+
 def dump_csv(jmap: JMapInfo, file_path: str, encoding: str = "utf-8"):
     """
     Dumps the JMapInfo's data to the specified CSV file. The CSV file is comma-delimited and may use quote marks for
-    quoted strings.
+    quoted strings. The data is collected column by column and written in bulk.
 
     :param jmap: the JMapInfo container.
     :param file_path: the file path to the CSV file.
     :param encoding: the CSV file's encoding, expects utf-8 by default.
     """
+    profiler = __PROFILER_STATE__.profiler
+    start = time.perf_counter() if profiler is not None else 0.0
+
     with open(file_path, "w", encoding=encoding, newline="") as f:
         csv_writer = csv.writer(f, delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL)
 
         # Write fields header
+        fields = jmap._data_fields_()
         field_descs = [
             f"{field.name}:{__CSV_FIELD_TYPES__[field.type.value]}:{__CSV_FIELD_DEFAULTS__[field.type.value]}"
-            for field in jmap._fields_.values()
+            for field in fields
         ]
         csv_writer.writerow(field_descs)
 
         # Write entries
-        for entry in jmap:
-            csv_writer.writerow([str(entry[field.hash]) for field in jmap._fields_.values()])
+        columns = [jmap._get_values_(field.hash) for field in fields]
+
+        if columns:
+            csv_writer.writerows(zip(*columns))
+        else:
+            csv_writer.writerows([] for _ in range(len(jmap)))
 
         f.flush()
+
+        if profiler is not None:
+            profiler.record("write_csv", time.perf_counter() - start, rows=len(jmap), bytes=f.tell())
+
+
+def dump_jsonl(jmap: JMapInfo, file_path: str, encoding: str = "utf-8"):
+    """
+    Dumps the JMapInfo's data to the specified JSON Lines file. Every entry is written as a JSON object on its own line
+    that maps field names to values.
+
+    :param jmap: the JMapInfo container.
+    :param file_path: the file path to the JSON Lines file.
+    :param encoding: the file's encoding, expects utf-8 by default.
+    """
+    fields = jmap._data_fields_()
+    names = [field.name for field in fields]
+    columns = [jmap._get_values_(field.hash) for field in fields]
+    rows = zip(*columns) if columns else [() for _ in range(len(jmap))]
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    with open(file_path, "w", encoding=encoding, newline="\n") as f:
+        f.writelines(encode(dict(zip(names, row))) + "\n" for row in rows)
+
+
+__NUMPY_DTYPES__ = {
+    JMapFieldType.LONG: ("u4", "i4"),
+    JMapFieldType.STRING: ("S32", "S32"),
+    JMapFieldType.FLOAT: ("f4", "f4"),
+    JMapFieldType.UNSIGNED_LONG: ("u4", "i4"),
+    JMapFieldType.SHORT: ("u2", "i2"),
+    JMapFieldType.CHAR: ("u1", "i1"),
+    JMapFieldType.STRING_OFFSET: ("u4", "u4")
+}
+
+
+def to_numpy(hashtable: JMapHashTable, source, big_endian: bool = True, encoding: str = "shift_jisx0213",
+             fields=None, offset: int = 0):
+    """
+    Converts JMap / BCSV data to a NumPy structured array without creating a JMapInfo container. Every field is read
+    straight from the raw entry region as a strided view and converted as a whole. Bit-packed fields are extracted and
+    sign-extended like they are when unpacking a container, numeric fields use the native byte order and strings are
+    decoded to unicode. Only the specified fields (names or hashes) are converted, in the given order. All fields will
+    be converted if no fields are specified. This requires NumPy to be installed.
+
+    :param hashtable: the hash lookup table to be used.
+    :param source: the file path to the JMap / BCSV file or the byte buffer.
+    :param big_endian: the endianness of the data.
+    :param encoding: the encoding for strings.
+    :param fields: the keys (names or hashes) of the fields to be converted.
+    :param offset: the offset into the buffer.
+    :return: the structured array with a named column for every field.
+    :raises JMapException: if NumPy is not installed.
+    """
+    if numpy is None:
+        raise JMapException("NumPy is required to convert JMap data to arrays!")
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = bytes(source) if isinstance(source, memoryview) else source
+
+    jmap = JMapInfo(hashtable)
+    num_entries, off_entries, off_strings = jmap._unpack_fields_(data, offset, big_endian)
+    selected = jmap.fields if fields is None else tuple(jmap.get_field(field_key) for field_key in fields)
+    endian = ">" if big_endian else "<"
+    string_pool = _JMapStringPoolReader(data, off_strings, encoding)
+    arrays = list()
+
+    for field in selected:
+        field_type = field.type
+        storage, output = __NUMPY_DTYPES__[field_type]
+
+        if field._offset_ + numpy.dtype(storage).itemsize > jmap._entry_size_:
+            raise JMapException(f"Field data exceeds entry size of 0x{jmap._entry_size_:X} bytes!")
+
+        raw = numpy.ndarray((num_entries,), numpy.dtype(endian + storage), data, off_entries + field._offset_,
+                            (jmap._entry_size_,))
+
+        if field_type is JMapFieldType.FLOAT:
+            values = raw.astype(output)
+        elif field_type is JMapFieldType.STRING:
+            strings = {val: val.split(b"\0", 1)[0].decode(encoding) for val in set(raw.tolist())}
+            values = numpy.array([strings[val] for val in raw.tolist()], dtype=str)
+        elif field_type is JMapFieldType.STRING_OFFSET:
+            values = numpy.array(string_pool.decode(raw.tolist()), dtype=str)
+        else:
+            mask = field.mask & field_type.mask
+            sign = 1 << (field_type.size * 8 - 1)
+            sign = sign if (mask >> field.shift) & sign else 0
+            values = (raw.astype(numpy.int64) & mask) >> field.shift
+
+            if sign:
+                values = numpy.where(values & sign, values - (sign << 1), values)
+
+            values = values.astype(output)
+
+        arrays.append((field.name, values))
+
+    result = numpy.empty(num_entries, dtype=[(name, values.dtype) for name, values in arrays])
+
+    for name, values in arrays:
+        result[name] = values
+
+    return result
+
+
+def dump_npz(hashtable: JMapHashTable, source, file_path: str, big_endian: bool = True,
+             encoding: str = "shift_jisx0213", fields=None, offset: int = 0, compressed: bool = False):
+    """
+    Converts JMap / BCSV data to arrays and saves them to the specified .npz file, using the field names as keys. See
+    to_numpy for details on the conversion. This requires NumPy to be installed.
+
+    :param hashtable: the hash lookup table to be used.
+    :param source: the file path to the JMap / BCSV file or the byte buffer.
+    :param file_path: the file path to the .npz file.
+    :param big_endian: the endianness of the data.
+    :param encoding: the encoding for strings.
+    :param fields: the keys (names or hashes) of the fields to be converted.
+    :param offset: the offset into the buffer.
+    :param compressed: whether the arrays should be compressed.
+    :raises JMapException: if NumPy is not installed.
+    """
+    values = to_numpy(hashtable, source, big_endian, encoding, fields, offset)
+    save = numpy.savez_compressed if compressed else numpy.savez
+    save(file_path, **{name: values[name] for name in values.dtype.names})
@@ -0,0 +1,375 @@
+"""
+Recovery of unknown field names. Fields whose names are not listed in a lookup file can only be identified by their
+hash, for example [DEADBEEF]. This module tests large amounts of candidate names against a set of such hashes. The
+candidates are built from a simple grammar: a sequence of parts, where every part is a list of alternatives. Each
+candidate is the concatenation of one alternative from every part, for example a prefix, a word and a number. Hashes
+are calculated incrementally for shared prefixes, and the last part is hashed in batches using vectorized arithmetic.
+NumPy is used for that if it is installed. The work is spread over a process pool, and matches can be added straight
+to a JMapHashTable.
+
+recovery = JMapHashRecovery(["[DEADBEEF]", 0x12345678])
+recovery.run(["Obj", "Map"], load_wordlist("words.txt"), ["", "Id", "Name"], number_range(0, 10))
+recovery.add_to(hash_table)
+"""
+
+__all__ = ["JMapHashRecovery", "number_range", "load_wordlist"]
+
+import concurrent.futures
+import itertools
+import os
+import time
+
+from .jmap import JMapHashTable, calc_jgadget_hash, calc_old_hash
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Grammar helpers
+# ----------------------------------------------------------------------------------------------------------------------
+def number_range(start: int, stop: int, width: int = 0) -> list:
+    """
+    Creates a part that consists of the decimal numbers from start (inclusive) to stop (exclusive). The numbers are
+    padded with leading zeros to the given width.
+
+    :param start: the first number.
+    :param stop: the number to stop at.
+    :param width: the minimum number of digits.
+    :return: the list of numbers as strings.
+    """
+    return [str(i).zfill(width) for i in range(start, stop)]
+
+
+def load_wordlist(file_path: str, encoding: str = "utf-8") -> list:
+    """
+    Loads a part from a word list file. Every line corresponds to a word. Empty lines and lines that start with a '#'
+    will be ignored. Duplicate words are removed.
+
+    :param file_path: the path to the word list file.
+    :param encoding: the file's encoding.
+    :return: the list of words.
+    """
+    with open(file_path, "r", encoding=encoding) as f:
+        words = (line.strip("\r\n") for line in f)
+        return list(dict.fromkeys(word for word in words if word and not word.startswith("#")))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Batched hash calculation
+# ----------------------------------------------------------------------------------------------------------------------
+def _encode_part_(part: str) -> list:
+    # Signed chars, like the hash functions themselves
+    return [ch - 0x100 if ch & 0x80 else ch for ch in part.encode("ascii")]
+
+
+class _JGadgetHasher:
+    """
+    Batched JGadget hashing. As the hash is a polynomial over the characters, the hash of a concatenation can be
+    calculated as hash(a + b) = hash(a) * 31 ** len(b) + hash(b), so every part needs to be hashed only once.
+    """
+
+    def __init__(self, last_part: list):
+        self._last_ = [self.prepare(part) for part in last_part]
+
+        if numpy is not None:
+            self._last_factors_ = numpy.array([factor for factor, _ in self._last_], dtype=numpy.uint64)
+            self._last_hashes_ = numpy.array([part_hash for _, part_hash in self._last_], dtype=numpy.uint64)
+
+    @staticmethod
+    def prepare(part: str) -> tuple:
+        return pow(31, len(part), 1 << 32), calc_jgadget_hash(part)
+
+    @staticmethod
+    def extend(state: int, prepared: tuple) -> int:
+        factor, part_hash = prepared
+        return (state * factor + part_hash) & 0xFFFFFFFF
+
+    def finish(self, state: int):
+        if numpy is not None:
+            # Products wrap around at 64 bits, which keeps the lower 32 bits intact
+            hashes = (numpy.uint64(state) * self._last_factors_ + self._last_hashes_) & numpy.uint64(0xFFFFFFFF)
+            return hashes.astype(numpy.int64)
+
+        return [(state * factor + part_hash) & 0xFFFFFFFF for factor, part_hash in self._last_]
+
+
+class _OldHasher:
+    """
+    Batched hashing using the old hash function. The hash cannot be composed from the hashes of its parts, so the state
+    after every prefix is extended character by character. The last part is grouped by length and hashed one character
+    position at a time for all strings of a group.
+    """
+
+    def __init__(self, last_part: list):
+        self._last_ = [_encode_part_(part) for part in last_part]
+
+        if numpy is not None:
+            groups = dict()
+
+            for i, chars in enumerate(self._last_):
+                groups.setdefault(len(chars), []).append(i)
+
+            self._order_ = numpy.array([i for indices in groups.values() for i in indices], dtype=numpy.int64)
+            self._groups_ = [
+                numpy.array([self._last_[i] for i in indices], dtype=numpy.int64).reshape(len(indices), length)
+                for length, indices in groups.items()
+            ]
+
+    @staticmethod
+    def prepare(part: str) -> list:
+        return _encode_part_(part)
+
+    @staticmethod
+    def extend(state: int, prepared: list) -> int:
+        for ch in prepared:
+            state = (((state << 8) & 0xFFFFFFFF) + ch) % 33554393
+
+        return state
+
+    def finish(self, state: int):
+        if numpy is not None:
+            results = list()
+
+            for chars in self._groups_:
+                states = numpy.full(len(chars), state, dtype=numpy.int64)
+
+                for column in chars.T:
+                    states = (((states << 8) & 0xFFFFFFFF) + column) % 33554393
+
+                results.append(states)
+
+            hashes = numpy.empty(len(self._order_), dtype=numpy.int64)
+            hashes[self._order_] = numpy.concatenate(results) if results else results
+            return hashes
+
+        return [self.extend(state, chars) for chars in self._last_]
+
+
+__HASHERS__ = {"jgadget": _JGadgetHasher, "old": _OldHasher}
+
+# State of the current worker process, see _init_worker_
+__WORKER__ = dict()
+__RUN_IDS__ = itertools.count()
+
+
+def _init_worker_(run_id: tuple, algorithm: str, parts: list, targets: frozenset):
+    # Prepares the parts once per run, workers are reused across tasks of the same run
+    if __WORKER__.get("run_id") == run_id:
+        return
+
+    hasher = __HASHERS__[algorithm]
+    __WORKER__["run_id"] = run_id
+    __WORKER__["hasher"] = hasher(parts[-1])
+    __WORKER__["prefixes"] = [[hasher.prepare(part) for part in alternatives] for alternatives in parts[:-1]]
+
+    if numpy is not None:
+        __WORKER__["target_array"] = numpy.array(sorted(targets), dtype=numpy.int64)
+
+
+def _iter_prefix_indices_(radices: list, start: int, stop: int):
+    # Yields the mixed-radix digits for every prefix index from start to stop
+    digits = list()
+    index = start
+
+    for radix in reversed(radices):
+        index, digit = divmod(index, radix)
+        digits.append(digit)
+
+    digits.reverse()
+
+    for _ in range(stop - start):
+        yield tuple(digits)
+
+        # Increment digits like an odometer
+        for i in reversed(range(len(digits))):
+            digits[i] += 1
+
+            if digits[i] < radices[i]:
+                break
+
+            digits[i] = 0
+
+
+def _run_task_(run_id: tuple, algorithm: str, parts: list, targets: frozenset, start: int, stop: int) -> tuple:
+    # Tests all candidates whose prefix index lies between start and stop
+    _init_worker_(run_id, algorithm, parts, targets)
+    hasher = __WORKER__["hasher"]
+    prefixes = __WORKER__["prefixes"]
+    last_part = parts[-1]
+    matches = list()
+
+    for digits in _iter_prefix_indices_([len(alternatives) for alternatives in prefixes], start, stop):
+        state = 0
+
+        for prepared, digit in zip(prefixes, digits):
+            state = hasher.extend(state, prepared[digit])
+
+        hashes = hasher.finish(state)
+
+        if numpy is not None:
+            found = numpy.nonzero(numpy.isin(hashes, __WORKER__["target_array"]))[0].tolist()
+        else:
+            found = [i for i, field_hash in enumerate(hashes) if field_hash in targets]
+
+        if found:
+            prefix = "".join(alternatives[digit] for alternatives, digit in zip(parts, digits))
+
+            for i in found:
+                matches.append((int(hashes[i]), prefix + last_part[i]))
+
+    return (stop - start) * len(last_part), matches
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Recovery engine
+# ----------------------------------------------------------------------------------------------------------------------
+class JMapHashRecovery:
+    """
+    Tests candidate field names against a set of target hashes using a process pool. Progress and throughput counters
+    are updated while running and can be observed using a callback. Matches are collected per hash, since different
+    candidates may result in the same hash.
+    """
+
+    __ALGORITHMS__ = {calc_jgadget_hash: "jgadget", calc_old_hash: "old"}
+
+    def __init__(self, targets, hash_func=calc_jgadget_hash, jobs: int = None, batch_size: int = 1 << 20):
+        """
+        Constructs a new recovery engine for the given target hashes. Targets may be specified as integers or as
+        hexadecimal strings with or without square brackets, like the names that JMapHashTable.find returns for
+        unknown hashes. The hash function may be specified as calc_jgadget_hash, calc_old_hash or by a hash table that
+        uses one of them.
+
+        :param targets: the iterable of hashes to be recovered.
+        :param hash_func: the hashing algorithm or a hash table.
+        :param jobs: the number of worker processes. Uses the number of CPUs if None, and no processes if 1.
+        :param batch_size: the approximate number of candidates tested per task.
+        :raises ValueError: if the hash function is not supported.
+        """
+        if isinstance(hash_func, JMapHashTable):
+            hash_func = hash_func._hash_func_
+
+        if hash_func not in self.__ALGORITHMS__:
+            raise ValueError(f"Unsupported hash function {hash_func!r}!")
+
+        self._algorithm_ = self.__ALGORITHMS__[hash_func]
+        self._targets_ = frozenset(self._parse_target_(target) for target in targets)
+        self._jobs_ = jobs if jobs else os.cpu_count() or 1
+        self._batch_size_ = batch_size
+        self._matches_ = dict()
+        self.tested = 0      # Number of candidates tested so far
+        self.total = 0       # Total number of candidates of the current run
+        self.elapsed = 0.0   # Time in seconds spent on the current run
+
+    @staticmethod
+    def _parse_target_(target) -> int:
+        if isinstance(target, str):
+            return int(target.strip("[]"), 16)
+
+        return target
+
+    @property
+    def targets(self) -> frozenset:
+        """The hashes to be recovered."""
+        return self._targets_
+
+    @property
+    def matches(self) -> dict:
+        """Maps recovered hashes to the list of matching names."""
+        return self._matches_
+
+    @property
+    def remaining(self) -> frozenset:
+        """The hashes that have not been recovered yet."""
+        return self._targets_.difference(self._matches_)
+
+    @property
+    def rate(self) -> float:
+        """The number of candidates tested per second during the current run."""
+        return self.tested / self.elapsed if self.elapsed > 0 else 0.0
+
+    def run(self, *parts, callback=None) -> dict:
+        """
+        Tests all candidates built from the given parts. Every part is either a string or a list of alternative
+        strings. The callback is called with this engine after every completed task and can be used to report the
+        progress. Matches accumulate over multiple runs.
+
+        :param parts: the parts of the grammar.
+        :param callback: the function to call with the engine after every task.
+        :return: the dictionary of recovered hashes and matching names.
+        """
+        parts = [[part] if isinstance(part, str) else list(part) for part in parts]
+
+        if not parts:
+            raise ValueError("At least one part is required!")
+
+        num_prefixes = 1
+
+        for alternatives in parts[:-1]:
+            num_prefixes *= len(alternatives)
+
+        self.total = num_prefixes * len(parts[-1])
+        self.tested = 0
+        self.elapsed = 0.0
+
+        if self.total == 0 or not self._targets_:
+            return self._matches_
+
+        # Split the prefixes into tasks of roughly the same number of candidates
+        step = max(1, self._batch_size_ // len(parts[-1]))
+        run = ((os.getpid(), next(__RUN_IDS__)), self._algorithm_, parts, self._targets_)
+        tasks = [run + (start, min(start + step, num_prefixes)) for start in range(0, num_prefixes, step)]
+        start_time = time.perf_counter()
+
+        def collect(result):
+            num_tested, matches = result
+            self.tested += num_tested
+            self.elapsed = time.perf_counter() - start_time
+
+            for field_hash, name in matches:
+                names = self._matches_.setdefault(field_hash, [])
+
+                if name not in names:
+                    names.append(name)
+
+            if callback is not None:
+                callback(self)
+
+        if self._jobs_ == 1 or len(tasks) == 1:
+            for task in tasks:
+                collect(_run_task_(*task))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(self._jobs_) as pool:
+                futures = [pool.submit(_run_task_, *task) for task in tasks]
+
+                for future in concurrent.futures.as_completed(futures):
+                    collect(future.result())
+
+        return self._matches_
+
+    def add_to(self, hash_table: JMapHashTable) -> int:
+        """
+        Adds all recovered names to the given hash table. If multiple names were found for the same hash, only the first
+        one is used.
+
+        :param hash_table: the hash table to add the names to.
+        :return: the number of names that were added.
+        :raises ValueError: if the hash table uses a different hash function.
+        """
+        algorithm = self.__ALGORITHMS__.get(hash_table._hash_func_)
+
+        if algorithm is None:
+            # Unknown hash functions are checked by hashing the recovered names
+            mismatch = any(hash_table.calc(names[0]) != field_hash for field_hash, names in self._matches_.items())
+        else:
+            mismatch = algorithm != self._algorithm_
+
+        if mismatch:
+            raise ValueError(f"Hash table uses a different hash function than the {self._algorithm_} hashes!")
+
+        for names in self._matches_.values():
+            hash_table.add(names[0])
+
+        return len(self._matches_)
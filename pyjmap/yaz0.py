@@ -0,0 +1,196 @@
+"""
+Yaz0 compression, the LZ77-based scheme used by first-party GameCube and Wii games for files and archives that contain
+JMap data. A Yaz0 stream starts with a 16-byte header that holds the magic "Yaz0" and the big-endian decompressed size.
+It is followed by groups of up to eight chunks. Each group is preceded by a code byte whose bits (from the most
+significant one) specify if a chunk is a literal byte or a back-reference to previously decompressed data.
+"""
+
+__all__ = ["Yaz0Exception", "is_compressed", "decompress", "compress"]
+
+import struct
+
+
+__HEADER__ = struct.Struct(">4sI8x")
+__MAGIC__ = b"Yaz0"
+__MAX_DISTANCE__ = 0x1000
+__MAX_LENGTH__ = 0xFF + 0x12
+__MIN_LENGTH__ = 3
+
+
+class Yaz0Exception(Exception):
+    """
+    An exception that is thrown when Yaz0-compressed data is malformed.
+    """
+    pass
+
+
+def is_compressed(data, offset: int = 0) -> bool:
+    """
+    Checks if the data at the given offset starts with a Yaz0 header.
+
+    :param data: the byte buffer.
+    :param offset: the offset into the buffer.
+    :return: True if the data is Yaz0-compressed, otherwise False.
+    """
+    return data[offset:offset + 4] == __MAGIC__
+
+
+def decompress(data, offset: int = 0) -> bytearray:
+    """
+    Decompresses the Yaz0-compressed data at the given offset. Back-references are resolved using bulk slice copies, and
+    groups that consist of eight literals are copied at once.
+
+    :param data: the byte buffer containing the compressed data.
+    :param offset: the offset into the buffer.
+    :return: the decompressed data.
+    :raises Yaz0Exception: if the data is not Yaz0-compressed or truncated.
+    """
+    if len(data) < offset + __HEADER__.size:
+        raise Yaz0Exception("Not enough data for a Yaz0 header!")
+
+    magic, size = __HEADER__.unpack_from(data, offset)
+
+    if magic != __MAGIC__:
+        raise Yaz0Exception("Data is not Yaz0-compressed!")
+
+    src = bytes(data) if not isinstance(data, (bytes, bytearray)) else data
+    src_pos = offset + __HEADER__.size
+    src_end = len(src)
+    out = bytearray(size)
+    out_pos = 0
+
+    try:
+        while out_pos < size:
+            code = src[src_pos]
+            src_pos += 1
+
+            # Fast path for eight literals
+            if code == 0xFF and out_pos + 8 <= size:
+                if src_pos + 8 > src_end:
+                    raise IndexError
+                out[out_pos:out_pos + 8] = src[src_pos:src_pos + 8]
+                src_pos += 8
+                out_pos += 8
+                continue
+
+            for bit in range(8):
+                if out_pos >= size:
+                    break
+
+                if code & (0x80 >> bit):
+                    out[out_pos] = src[src_pos]
+                    src_pos += 1
+                    out_pos += 1
+                    continue
+
+                b1 = src[src_pos]
+                b2 = src[src_pos + 1]
+                src_pos += 2
+                distance = ((b1 & 0xF) << 8 | b2) + 1
+
+                if b1 >> 4:
+                    length = (b1 >> 4) + 2
+                else:
+                    length = src[src_pos] + 0x12
+                    src_pos += 1
+
+                copy_pos = out_pos - distance
+                length = min(length, size - out_pos)
+
+                if copy_pos < 0:
+                    raise Yaz0Exception(f"Invalid back-reference at offset 0x{src_pos:X}!")
+
+                if distance >= length:
+                    out[out_pos:out_pos + length] = out[copy_pos:copy_pos + length]
+                else:
+                    # Overlapping back-reference, repeat the referenced pattern
+                    pattern = out[copy_pos:out_pos]
+                    out[out_pos:out_pos + length] = (pattern * (length // distance + 1))[:length]
+
+                out_pos += length
+    except IndexError:
+        raise Yaz0Exception("Yaz0-compressed data is truncated!") from None
+
+    return out
+
+
+def compress(data, search_depth: int = 32) -> bytes:
+    """
+    Compresses the given data using Yaz0. Matches are found using hash chains over three-byte sequences. The search
+    depth limits the number of candidates that are compared for every position; higher values result in better
+    compression at the cost of speed. A search depth of 0 stores all bytes as literals.
+
+    :param data: the data to be compressed.
+    :param search_depth: the maximum number of match candidates per position.
+    :return: the Yaz0-compressed data.
+    """
+    src = bytes(data)
+    size = len(src)
+    out = bytearray(__HEADER__.pack(__MAGIC__, size))
+    chains = dict()
+    pos = 0
+
+    while pos < size:
+        code_pos = len(out)
+        out.append(0)
+        code = 0
+
+        for bit in range(8):
+            if pos >= size:
+                break
+
+            best_length = __MIN_LENGTH__ - 1
+            best_distance = 0
+
+            if search_depth and pos + __MIN_LENGTH__ <= size:
+                key = src[pos:pos + __MIN_LENGTH__]
+                candidates = chains.get(key)
+                max_length = min(__MAX_LENGTH__, size - pos)
+
+                if candidates is not None:
+                    for candidate in reversed(candidates[-search_depth:]):
+                        if pos - candidate > __MAX_DISTANCE__:
+                            break
+
+                        # Quickly reject candidates that cannot be longer than the best match
+                        if src[candidate + best_length] != src[pos + best_length]:
+                            continue
+
+                        length = __MIN_LENGTH__
+
+                        while length < max_length and src[candidate + length] == src[pos + length]:
+                            length += 1
+
+                        if length > best_length:
+                            best_length = length
+                            best_distance = pos - candidate
+
+                            if length == max_length:
+                                break
+
+                    if len(candidates) > search_depth * 4:
+                        del candidates[:-search_depth]
+
+            if best_distance:
+                distance = best_distance - 1
+
+                if best_length >= 0x12:
+                    out += bytes((distance >> 8, distance & 0xFF, best_length - 0x12))
+                else:
+                    out += bytes(((best_length - 2) << 4 | distance >> 8, distance & 0xFF))
+
+                next_pos = pos + best_length
+            else:
+                code |= 0x80 >> bit
+                out.append(src[pos])
+                next_pos = pos + 1
+
+            if search_depth:
+                for i in range(pos, min(next_pos, size - __MIN_LENGTH__ + 1)):
+                    chains.setdefault(src[i:i + __MIN_LENGTH__], []).append(i)
+
+            pos = next_pos
+
+        out[code_pos] = code
+
+    return bytes(out)
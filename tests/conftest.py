@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def cache_dir(tmp_path_factory):
+    # Keep lookup caches out of the user's cache directory
+    path = str(tmp_path_factory.mktemp("cache"))
+    os.environ["PYJMAP_CACHE_DIR"] = path
+    return path
+
+
+@pytest.fixture(scope="session")
+def hashtable(cache_dir):
+    import pyjmap
+    return pyjmap.SuperMarioGalaxyHashTable()
@@ -0,0 +1,214 @@
+import functools
+
+import pytest
+
+import pyjmap
+from pyjmap import JMapFieldType
+
+
+def make_table(hashtable, columnar: bool = False, rows: int = 10) -> pyjmap.JMapInfo:
+    jmap = pyjmap.JMapInfo(hashtable, columnar)
+    jmap.create_field("name", JMapFieldType.STRING_OFFSET, "")
+    jmap.create_field("ScenarioNo", JMapFieldType.LONG, -1)
+    jmap.create_field("PowerStarId", JMapFieldType.SHORT, 0)
+    jmap.create_field("Scale", JMapFieldType.FLOAT, 1.0)
+
+    for i in range(rows):
+        entry = jmap.create_entry()
+        entry["name"] = f"Galaxy{i % 4}"
+        entry["ScenarioNo"] = i
+        entry["PowerStarId"] = i % 7
+        entry["Scale"] = i * 0.5
+
+    return jmap
+
+
+def test_clear_lazy_columnar(hashtable, tmp_path):
+    path = str(tmp_path / "table.bcsv")
+    pyjmap.write_file(make_table(hashtable), path)
+
+    jmap = pyjmap.from_file(hashtable, path, columnar=True, lazy=True)
+    decoded = jmap[0]
+    jmap.clear_entries()
+    entry = jmap.create_entry()
+
+    assert len(jmap) == 1
+    assert entry["ScenarioNo"] == 0 and entry["name"] == ""
+    assert decoded.jmap is None and decoded[pyjmap.calc_jgadget_hash("ScenarioNo")] == 0
+
+    unpacked = pyjmap.from_buffer(hashtable, jmap.makebin(True, "shift_jisx0213"), 0)
+    assert [e["ScenarioNo"] for e in unpacked] == [0]
+
+
+def test_columnar_accepts_out_of_range_values(hashtable):
+    results = list()
+
+    for columnar in (False, True):
+        jmap = pyjmap.JMapInfo(hashtable, columnar)
+        jmap.create_field("s", JMapFieldType.SHORT, 0)
+        jmap.create_field("c", JMapFieldType.CHAR, 0)
+        jmap.create_field("l", JMapFieldType.LONG, 0)
+
+        entry = jmap.create_entry()
+        entry["s"] = 2 ** 40
+        entry["c"] = -300
+        entry["l"] = 2 ** 70
+        jmap.create_entry()
+        jmap.extend([(40000, 200, 0xFFFFFFFF)])
+
+        results.append(([dict(entry.data()) for entry in jmap], bytes(jmap.makebin(True, "shift_jisx0213"))))
+
+    assert results[0] == results[1]
+
+
+def test_failed_extend_changes_nothing(hashtable):
+    for columnar in (False, True):
+        jmap = pyjmap.JMapInfo(hashtable, columnar)
+        jmap.create_field("a", JMapFieldType.LONG, 0)
+        jmap.create_field("s", JMapFieldType.SHORT, 0)
+        jmap.extend([(1, 2)])
+        packed = bytes(jmap.makebin(True, "shift_jisx0213"))
+
+        with pytest.raises(TypeError):
+            jmap.extend([(5, 6), (7, 8.0)])
+        with pytest.raises(pyjmap.JMapException):
+            jmap.extend([(5, 6), (7,)])
+
+        assert len(jmap) == 1
+        assert jmap.get_column("a") == [1] and jmap.get_column("s") == [2]
+        assert bytes(jmap.makebin(True, "shift_jisx0213")) == packed
+
+        jmap.extend([(5, 2 ** 40)])
+        assert jmap.get_column("a") == [1, 5] and jmap.get_column("s") == [2, 2 ** 40]
+
+
+def test_diff_aligns_rows(hashtable):
+    old = make_table(hashtable, rows=50)
+    new = make_table(hashtable, True, rows=50)
+    new.remove_entry(10)
+    new[20]["Scale"] = 100.0
+    new.create_entry()["ScenarioNo"] = 1000
+
+    changes = pyjmap.diff(old, new)
+    assert changes.removed_rows == [10] and changes.added_rows == [49]
+    assert [(change.old_index, change.new_index) for change in changes.changed_rows] == [(21, 20)]
+    assert len(changes.pairs) == 49
+
+
+def test_diff_key_not_decoded(hashtable, tmp_path):
+    path = str(tmp_path / "table.bcsv")
+    pyjmap.write_file(make_table(hashtable), path)
+    projected = pyjmap.from_file(hashtable, path, fields=["ScenarioNo"])
+
+    with pytest.raises(KeyError, match="not decoded"):
+        pyjmap.diff(make_table(hashtable), projected, key="name")
+
+
+def test_index_kinds_and_detaching(hashtable):
+    jmap = make_table(hashtable)
+    hashed = jmap.create_index("ScenarioNo")
+    ordered = jmap.create_index("ScenarioNo", sorted=True)
+
+    assert jmap.get_index("ScenarioNo") is hashed and jmap.get_index("ScenarioNo", sorted=True) is ordered
+    jmap[3]["ScenarioNo"] = 100
+    assert hashed.get(100) is jmap[3] and [e["ScenarioNo"] for e in ordered.range(8)] == [8, 9, 100]
+
+    replaced = jmap.create_index("ScenarioNo")
+    assert jmap.get_index("ScenarioNo") is replaced and jmap.get_index("ScenarioNo", sorted=True) is ordered
+
+    with pytest.raises(pyjmap.JMapException):
+        hashed.get(100)
+
+    jmap.drop_field("ScenarioNo")
+    assert jmap.get_index("name") is None
+
+    for index in (replaced, ordered):
+        with pytest.raises(pyjmap.JMapException):
+            index.find(100)
+
+
+def test_csv_blank_lines_do_not_end_input(hashtable, tmp_path):
+    csv_path = str(tmp_path / "table.csv")
+    pyjmap.dump_csv(make_table(hashtable, rows=3), csv_path)
+
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        header, *rows = f.read().splitlines(keepends=True)
+
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        f.write(header + rows[0] + "\r\n" * 10000 + "".join(rows[1:]))
+
+    jmap = pyjmap.from_csv(hashtable, csv_path)
+    assert [entry["ScenarioNo"] for entry in jmap] == [0, 1, 2]
+
+    bcsv_path = str(tmp_path / "table.bcsv")
+    assert pyjmap.convert_csv(hashtable, csv_path, bcsv_path) == 3
+    assert [entry["ScenarioNo"] for entry in pyjmap.from_file(hashtable, bcsv_path)] == [0, 1, 2]
+
+
+def test_lookup_cache_tells_apart_hash_functions(tmp_path):
+    lookup_path = str(tmp_path / "names.txt")
+
+    with open(lookup_path, "w", encoding="utf-8") as f:
+        f.write("# Names\nScenarioNo\n")
+
+    first = pyjmap.JMapHashTable(lambda name: pyjmap.calc_jgadget_hash(name), lookup_path)
+    second = pyjmap.JMapHashTable(lambda name: pyjmap.calc_old_hash(name), lookup_path)
+    first.find(0)
+    pyjmap.jmap.__LOOKUP_NAMES__.clear()
+
+    assert second.find(pyjmap.calc_old_hash("ScenarioNo")) == "ScenarioNo"
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("clone_first", [False, True])
+def test_copy_on_write_isolates_containers(hashtable, columnar, clone_first):
+    jmap = make_table(hashtable, columnar)
+    clone = jmap.copy()
+    first, second = (clone, jmap) if clone_first else (jmap, clone)
+
+    first[0]["ScenarioNo"] = -1
+    second[5]["ScenarioNo"] = 99
+
+    assert first[5]["ScenarioNo"] == 5 and second[0]["ScenarioNo"] == 0
+    assert first.get_column("ScenarioNo")[:6] == [-1, 1, 2, 3, 4, 5]
+    assert second.get_column("ScenarioNo")[:6] == [0, 1, 2, 3, 4, 99]
+
+
+def test_lookup_cache_accepts_unnamed_hash_functions(tmp_path):
+    lookup_path = str(tmp_path / "names.txt")
+
+    with open(lookup_path, "w", encoding="utf-8") as f:
+        f.write("ScenarioNo\n")
+
+    hash_func = functools.partial(pyjmap.calc_jgadget_hash)
+    assert pyjmap.JMapHashTable(hash_func, lookup_path).find(hash_func("ScenarioNo")) == "ScenarioNo"
+
+
+def test_parse_cache_accepts_unnamed_hash_functions(hashtable, tmp_path):
+    path = str(tmp_path / "table.bcsv")
+    pyjmap.write_file(make_table(hashtable), path)
+    cache = pyjmap.JMapParseCache(str(tmp_path / "cache"))
+    partial_table = pyjmap.JMapHashTable(functools.partial(pyjmap.calc_jgadget_hash), hashtable._lookup_file_path_)
+
+    for _ in range(2):
+        jmap = pyjmap.from_file(partial_table, path, cache=cache)
+        assert [entry["ScenarioNo"] for entry in jmap] == list(range(10))
+
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_merge_combines_changes(hashtable):
+    base = make_table(hashtable, rows=20)
+    ours = base.copy()
+    theirs = base.copy()
+
+    ours.create_field("Extra", JMapFieldType.SHORT, 7)
+    ours[2]["ScenarioNo"] = 200
+    theirs[3]["PowerStarId"] = 30
+    theirs.remove_entry(5)
+
+    merged, conflicts = pyjmap.merge(base, ours, theirs)
+    assert not conflicts and len(merged) == 19
+    assert merged[2]["ScenarioNo"] == 200 and merged[3]["PowerStarId"] == 30
+    assert [entry["ScenarioNo"] for entry in merged][4:7] == [4, 6, 7]
+    assert {entry["Extra"] for entry in merged} == {7}
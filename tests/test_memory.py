@@ -0,0 +1,40 @@
+import tracemalloc
+
+import pytest
+
+import pyjmap
+from pyjmap import JMapFieldType
+
+
+__NUM_ROWS__ = 20000
+__BYTES_PER_ROW__ = {False: 384, True: 192}  # Measured about 340 and 160 bytes on CPython 3.11
+
+
+@pytest.fixture(scope="module")
+def packed(hashtable):
+    jmap = pyjmap.JMapInfo(hashtable)
+    jmap.create_field("name", JMapFieldType.STRING_OFFSET, "")
+    jmap.create_field("ScenarioNo", JMapFieldType.LONG, -1)
+    jmap.create_field("PowerStarId", JMapFieldType.SHORT, 0)
+    jmap.create_field("Scale", JMapFieldType.FLOAT, 1.0)
+    jmap.extend([(f"Galaxy{i % 4}", i, i % 7, i * 0.5) for i in range(__NUM_ROWS__)])
+    return bytes(jmap.makebin(True, "shift_jisx0213"))
+
+
+def test_entries_have_no_dict(hashtable, packed):
+    jmap = pyjmap.from_buffer(hashtable, packed, 0)
+    assert not hasattr(jmap[0], "__dict__") and not hasattr(jmap.fields[0], "__dict__")
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_memory_per_row(hashtable, packed, columnar):
+    tracemalloc.start()
+
+    try:
+        jmap = pyjmap.from_buffer(hashtable, packed, 0, columnar=columnar)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(jmap) == __NUM_ROWS__
+    assert size / __NUM_ROWS__ <= __BYTES_PER_ROW__[columnar]
@@ -0,0 +1,22 @@
+import pytest
+
+import pyjmap
+
+
+def test_add_to_checks_hash_function(tmp_path):
+    target = pyjmap.calc_jgadget_hash("pyjmapRecoveredName")
+    recovery = pyjmap.JMapHashRecovery([target], jobs=1)
+    assert recovery.run("pyjmap", ["Recovered", "Missing"], "Name") == {target: ["pyjmapRecoveredName"]}
+
+    lookup_path = str(tmp_path / "names.txt")
+
+    with open(lookup_path, "w", encoding="utf-8") as f:
+        f.write("# Names\n")
+
+    for hash_func in (pyjmap.calc_old_hash, lambda name: pyjmap.calc_old_hash(name)):
+        with pytest.raises(ValueError):
+            recovery.add_to(pyjmap.JMapHashTable(hash_func, lookup_path))
+
+    hashtable = pyjmap.SuperMarioGalaxyHashTable()
+    assert recovery.add_to(hashtable) == 1
+    assert hashtable.find(target) == "pyjmapRecoveredName"